@@ -0,0 +1,52 @@
+"""
+Measures the start-up cost of Pykron in a fresh interpreter: importing
+pykron.core, creating the instance and running the first request, followed
+by the slowest imports reported by -X importtime.
+
+    python benchmarks/import_time.py
+"""
+
+import sys
+sys.path.append('.')
+sys.path.append('..')
+
+import os
+import statistics
+import subprocess
+import time
+
+REPEAT = 20
+TOP = 10
+
+STATEMENTS = [
+    ("interpreter", "pass"),
+    ("import pykron.core", "import pykron.core"),
+    ("+ Pykron()", "import pykron.core; pykron.core.Pykron.getInstance()"),
+    ("+ first request", "import pykron.core; pykron.core.Pykron(logging_level=40); pykron.core.Pykron.AsyncRequest()(abs)(1).wait_for_completed()"),
+]
+
+def run(statement):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], env=env, check=True)
+    return time.perf_counter() - start
+
+def importtime():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import pykron.core'], env=env, stderr=subprocess.PIPE, text=True, check=True)
+    rows = []
+    for line in res.stderr.splitlines()[1:]:
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return sorted(rows, reverse=True)[:TOP]
+
+if __name__ == '__main__':
+    run("import pykron.core") # warm the bytecode cache
+    print("%-20s %12s" % ("", "median [ms]"))
+    for label, statement in STATEMENTS:
+        t = statistics.median(run(statement) for i in range(REPEAT))
+        print("%-20s %12.1f" % (label, t * 1000))
+    print()
+    print("%12s %12s  %s" % ("cumul. [ms]", "self [ms]", "module"))
+    for cumulative_us, self_us, name in importtime():
+        print("%12.1f %12.1f  %s" % (cumulative_us / 1000, self_us / 1000, name))
@@ -0,0 +1,50 @@
+"""
+Per-item overhead of Pykron.map compared with concurrent.futures.Executor.map
+and with one decorated request per item, on a trivial function.
+
+    python benchmarks/map_overhead.py
+"""
+
+import sys
+sys.path.append('.')
+sys.path.append('..')
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pykron.core import Pykron
+
+ITEMS = 20000
+REQUESTS = 2000
+CHUNKSIZES = [16, 64, 256]
+
+def square(x):
+    return x * x
+
+def bench(fn, n):
+    start = time.perf_counter()
+    fn(n)
+    return (time.perf_counter() - start) / n
+
+def executor_map(n):
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(square, range(n)))
+
+def pykron_map(chunksize):
+    def run(n):
+        list(Pykron.map(square, range(n), chunksize=chunksize))
+    return run
+
+def pykron_requests(n):
+    request = Pykron.AsyncRequest()(square)
+    Pykron.join([request(i) for i in range(n)])
+
+if __name__ == '__main__':
+    Pykron(logging_level=logging.WARNING, pool=True)
+    print("%-28s %12s" % ("", "[us/item]"))
+    print("%-28s %12.2f" % ("Executor.map", bench(executor_map, ITEMS) * 1e6))
+    for chunksize in CHUNKSIZES:
+        print("%-28s %12.2f" % ("Pykron.map chunksize=%d" % chunksize, bench(pykron_map(chunksize), ITEMS) * 1e6))
+    print("%-28s %12.2f" % ("AsyncRequest per item", bench(pykron_requests, REQUESTS) * 1e6))
+    Pykron.close()
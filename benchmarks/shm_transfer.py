@@ -0,0 +1,57 @@
+"""
+Compares sending a payload to another process by pickling it through a pipe
+with sending a SharedBuffer handle to a pooled shared memory segment.
+
+    python benchmarks/shm_transfer.py
+"""
+
+import sys
+sys.path.append('.')
+sys.path.append('..')
+
+import multiprocessing
+import time
+
+from pykron.shm import SegmentPool
+
+SIZES_MB = [1, 5, 10, 25, 50]
+REPEAT = 10
+
+def echo_size(conn):
+    while True:
+        obj = conn.recv()
+        if obj is None:
+            break
+        if isinstance(obj, bytes):
+            conn.send(len(obj))
+        else:
+            conn.send(obj.buf[0] + len(obj))
+            obj.release()
+
+def bench(conn, make_payload):
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        payload = make_payload()
+        conn.send(payload)
+        conn.recv()
+        release = getattr(payload, 'release', None)
+        if release:
+            release()
+    return (time.perf_counter() - start) / REPEAT
+
+if __name__ == '__main__':
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=echo_size, args=(child,))
+    proc.start()
+    pool = SegmentPool()
+    print("%8s %12s %12s" % ("MB", "pickle [ms]", "shm [ms]"))
+    for size_mb in SIZES_MB:
+        data = bytes(size_mb << 20)
+        t_pickle = bench(parent, lambda: data)
+        # the shm figure includes the copy of the payload into the segment,
+        # producers writing directly into allocate() buffers avoid it
+        t_shm = bench(parent, lambda: pool.share(data))
+        print("%8d %12.3f %12.3f" % (size_mb, t_pickle * 1000, t_shm * 1000))
+    parent.send(None)
+    proc.join()
+    pool.close()
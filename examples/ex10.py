@@ -0,0 +1,20 @@
+import sys
+sys.path.append('..')
+
+from pykron.core import Pykron
+import time
+
+app = Pykron()
+
+# A 100 Hz control loop scheduled against absolute deadlines
+@Pykron.Periodic(period=0.01, overrun='skip')
+def control_loop():
+    time.sleep(0.002)
+
+req = control_loop()
+time.sleep(2)
+req.stop()
+stats = req.wait_for_completed()
+print(stats)
+
+app.close()
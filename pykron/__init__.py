@@ -0,0 +1,6 @@
+
+def sleep(delay):
+    ''' sleeps on the clock of the Pykron instance, see Pykron.sleep()
+    '''
+    from pykron.core import Pykron
+    Pykron.sleep(delay)
@@ -0,0 +1,137 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import threading
+import time
+
+class PykronAdmission:
+    ''' CoDel-style admission controller
+
+    The controller watches the queueing delay (Task.idle_time) of the tasks
+    being started. If the minimum delay observed over a whole interval stays
+    above the target, the runtime is considered overloaded and submissions with
+    a priority lower than min_priority are shed until the delay goes back
+    below the target. During an interval where no task started, e.g. a
+    saturated pool running long tasks, the delay is the age of the oldest
+    queued work (queue_age), the overload ends once nothing is queued.
+    Times are read from clock, the clock of the Pykron instance once
+    attached. Without a PykronPool (pool=True) every request gets its own
+    thread, the idle time is about 0 and the controller will almost never
+    shed.
+    '''
+
+    TARGET_DEFAULT = 0.005
+    INTERVAL_DEFAULT = 0.1
+
+    def __init__(self, target=TARGET_DEFAULT, interval=INTERVAL_DEFAULT, min_priority=1, clock=None, queue_age=None):
+        self._clock = clock
+        self._queue_age = queue_age
+        self._target = target
+        self._interval = interval
+        self._min_priority = min_priority
+        self._lock = threading.Lock()
+        self._interval_end = None
+        self._min_delay = None
+        self._overloaded = False
+        self._admitted = 0
+        self._shed = 0
+
+    @property
+    def admitted(self):
+        return self._admitted
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def min_priority(self):
+        return self._min_priority
+
+    @property
+    def overloaded(self):
+        return self._overloaded
+
+    @property
+    def shed(self):
+        return self._shed
+
+    @property
+    def target(self):
+        return self._target
+
+    def attach(self, clock, queue_age=None):
+        ''' called by the runtime: sets the clock, unless one was given, and
+        the function returning the age of the oldest queued work (None if
+        nothing is queued)
+        '''
+        if self._clock is None:
+            self._clock = clock
+        if queue_age is not None:
+            self._queue_age = queue_age
+
+    def now(self):
+        if self._clock is None:
+            return time.perf_counter()
+        return self._clock.now()
+
+    def admit(self, priority):
+        now = self.now()
+        with self._lock:
+            self._update(now)
+            if self._overloaded and priority < self._min_priority:
+                self._shed += 1
+                return False
+            self._admitted += 1
+            return True
+
+    def observe(self, delay):
+        now = self.now()
+        with self._lock:
+            if self._min_delay is None or delay < self._min_delay:
+                self._min_delay = delay
+            self._update(now)
+
+    def _update(self, now):
+        if self._interval_end is None:
+            self._interval_end = now + self._interval
+        elif now >= self._interval_end:
+            delay = self._min_delay
+            if delay is None and self._queue_age is not None:
+                # no task started: the queue is either empty or stuck
+                delay = self._queue_age()
+            self._overloaded = delay is not None and delay > self._target
+            self._min_delay = None
+            self._interval_end = now + self._interval
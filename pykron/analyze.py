@@ -0,0 +1,229 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy
+
+from pykron.journal import MAGIC, STATUSES, JournalReader
+
+USAGE = '''python -m pykron.analyze RUN [CANDIDATE] [-b BIN] [-t THRESHOLD] [-r RATE_THRESHOLD]
+
+RUN and CANDIDATE are CSV files saved by PykronLogger (save_csv=True) or
+journals (save_journal=True). With two runs, the per-function statistics of
+CANDIDATE are compared with those of RUN and regressions are flagged; the
+exit status is 1 if any is found.'''
+
+PERCENTILES = (50, 90, 99)
+TIME_COLUMNS = {'arrival': 'Arrival Ts', 'start': 'Start Ts', 'end': 'End Ts', 'duration': 'Duration', 'idle': 'Idle time'}
+
+def load(path):
+    ''' loads the execution records of a run as a dict of arrays: func (name
+    and location), status, arrival, start, end, duration and idle (seconds)
+    '''
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        return load_journal(path)
+    return load_csv(path)
+
+def load_csv(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    columns = {name: i for i, name in enumerate(header)}
+    run = {}
+    for key, name in TIME_COLUMNS.items():
+        i = columns[name]
+        run[key] = numpy.array([float(row[i]) if row[i] not in ('', 'None') else numpy.nan for row in rows], dtype=float)
+    f, l, s = columns['Function'], columns['Location'], columns['Status']
+    run['func'] = numpy.array(["%s %s" % (row[f], row[l]) for row in rows], dtype=object)
+    run['status'] = numpy.array([row[s] for row in rows], dtype=object)
+    return run
+
+def load_journal(path):
+    reader = JournalReader(path)
+    records = reader.to_numpy()
+    strings = numpy.array(reader.strings, dtype=object)
+    run = {}
+    for key, field in (('arrival', 'arrival_ts'), ('start', 'start_ts'), ('end', 'end_ts'), ('duration', 'duration'), ('idle', 'idle_time')):
+        values = records[field].astype(float)
+        values[values < 0] = numpy.nan
+        run[key] = values / 1e9
+    run['func'] = strings[records['func_name']] + ' ' + strings[records['func_loc']]
+    run['status'] = numpy.array(STATUSES, dtype=object)[records['status']]
+    # the array is a view of the mapped file
+    del records
+    reader.close()
+    return run
+
+def group_percentiles(groups, values, ngroups, percentiles):
+    ''' nearest-rank percentiles of values within each group, NaN values
+    are ignored. Returns an array of shape (ngroups, len(percentiles)).
+    '''
+    valid = ~numpy.isnan(values)
+    groups = groups[valid]
+    values = values[valid]
+    values = values[numpy.lexsort((values, groups))]
+    counts = numpy.bincount(groups, minlength=ngroups)
+    starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    result = numpy.full((ngroups, len(percentiles)), numpy.nan)
+    nonempty = counts > 0
+    for j, p in enumerate(percentiles):
+        rank = numpy.ceil(counts[nonempty] * p / 100.0).astype(int) - 1
+        result[nonempty, j] = values[starts[nonempty] + numpy.maximum(rank, 0)]
+    return result
+
+def function_stats(run):
+    ''' per-function statistics, as a dict function -> dict of values
+    '''
+    names, groups = numpy.unique(run['func'].astype(str), return_inverse=True)
+    n = len(names)
+    counts = numpy.bincount(groups, minlength=n)
+    durations = group_percentiles(groups, run['duration'], n, PERCENTILES + (100,))
+    idle = group_percentiles(groups, run['idle'], n, PERCENTILES + (100,))
+    failed = numpy.bincount(groups, weights=(run['status'] == 'FAILED'), minlength=n)
+    timeout = numpy.bincount(groups, weights=(run['status'] == 'TIMEOUT'), minlength=n)
+    stats = {}
+    for i, name in enumerate(names):
+        stats[name] = {
+            'count': int(counts[i]),
+            'duration': dict(zip(PERCENTILES + (100,), durations[i])),
+            'idle': dict(zip(PERCENTILES + (100,), idle[i])),
+            'failure_rate': failed[i] / counts[i],
+            'timeout_rate': timeout[i] / counts[i]}
+    return stats
+
+def timeline(run, bin_size=1.0):
+    ''' completed tasks per second and concurrency (maximum number of tasks
+    running at the same time) for each bin of bin_size seconds from the
+    first arrival. Returns (bin starts, throughput, concurrency).
+    '''
+    start = run['start']
+    end = run['end']
+    valid = ~(numpy.isnan(start) | numpy.isnan(end))
+    start, end = start[valid], end[valid]
+    if len(start) == 0:
+        return numpy.zeros(0), numpy.zeros(0), numpy.zeros(0, dtype=int)
+    t0 = numpy.nanmin(run['arrival'])
+    nbins = max(1, int(numpy.ceil((end.max() - t0) / bin_size)))
+    edges = t0 + bin_size * numpy.arange(nbins + 1)
+    throughput = numpy.histogram(end, bins=edges)[0] / bin_size
+    # +1 at each start, -1 at each end, ends first on ties
+    times = numpy.concatenate((end, start))
+    steps = numpy.concatenate((-numpy.ones(len(end), dtype=int), numpy.ones(len(start), dtype=int)))
+    order = numpy.lexsort((steps, times))
+    times, level = times[order], numpy.cumsum(steps[order])
+    # the level at the beginning of each bin, then the maximum of the steps in it
+    bins = numpy.clip(numpy.searchsorted(edges, times, side='right') - 1, 0, nbins - 1)
+    concurrency = numpy.zeros(nbins, dtype=int)
+    before = numpy.searchsorted(times, edges[:-1], side='right') - 1
+    concurrency[before >= 0] = level[before[before >= 0]]
+    numpy.maximum.at(concurrency, bins, level)
+    return edges[:-1] - t0, throughput, concurrency
+
+def diff(base, candidate, threshold=0.2, rate_threshold=0.01):
+    ''' compares the per-function statistics of two runs. A function
+    regresses when its p50 or p99 duration grows by more than threshold
+    (relative) or its failure or timeout rate grows by more than
+    rate_threshold (absolute). Returns a list of (function, metric, base,
+    candidate, regression).
+    '''
+    rows = []
+    for name in sorted(set(base) | set(candidate)):
+        if name not in base or name not in candidate:
+            rows.append((name, 'count', base.get(name, {}).get('count', 0), candidate.get(name, {}).get('count', 0), False))
+            continue
+        b, c = base[name], candidate[name]
+        for p in (50, 99):
+            old, new = b['duration'][p], c['duration'][p]
+            rows.append((name, 'p%d' % p, old, new, bool(new > old * (1 + threshold))))
+        for metric in ('failure_rate', 'timeout_rate'):
+            rows.append((name, metric, b[metric], c[metric], bool(c[metric] - b[metric] > rate_threshold)))
+    return rows
+
+def format_seconds(value):
+    if numpy.isnan(value):
+        return '-'
+    if value < 1.0:
+        return "%.3fms" % (value * 1000)
+    return "%.3fs" % value
+
+def format_stats(stats):
+    lines = ["%-40s %7s %10s %10s %10s %10s %10s %10s %7s %7s" % ("Function", "Count", "p50", "p90", "p99", "max", "idle p50", "idle p99", "failed", "timeout")]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['count']):
+        d = s['duration']
+        lines.append("%-40s %7d %10s %10s %10s %10s %10s %10s %6.1f%% %6.1f%%" % (
+            name[:40], s['count'], format_seconds(d[50]), format_seconds(d[90]), format_seconds(d[99]), format_seconds(d[100]),
+            format_seconds(s['idle'][50]), format_seconds(s['idle'][99]), s['failure_rate'] * 100, s['timeout_rate'] * 100))
+    return '\n'.join(lines)
+
+def format_timeline(starts, throughput, concurrency):
+    lines = ["%10s %14s %12s" % ("Time", "Throughput", "Concurrency")]
+    for t, x, c in zip(starts, throughput, concurrency):
+        lines.append("%9.1fs %12.1f/s %12d" % (t, x, c))
+    return '\n'.join(lines)
+
+def format_diff(rows):
+    lines = ["%-40s %-12s %12s %12s" % ("Function", "Metric", "Base", "Candidate")]
+    for name, metric, old, new, regression in rows:
+        if metric.startswith('p'):
+            old, new = format_seconds(old), format_seconds(new)
+        elif metric == 'count':
+            old, new = str(old), str(new)
+        else:
+            old, new = "%.1f%%" % (old * 100), "%.1f%%" % (new * 100)
+        lines.append("%-40s %-12s %12s %12s%s" % (name[:40], metric, old, new, '  REGRESSION' if regression else ''))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pykron.analyze', usage=USAGE)
+    parser.add_argument('run', help="CSV or journal of the run")
+    parser.add_argument('candidate', nargs='?', help="CSV or journal of a run to compare with RUN")
+    parser.add_argument('-b', '--bin', type=float, default=1.0, help="timeline bin size in seconds")
+    parser.add_argument('-t', '--threshold', type=float, default=0.2, help="relative duration increase flagged as regression")
+    parser.add_argument('-r', '--rate-threshold', type=float, default=0.01, help="failure or timeout rate increase flagged as regression")
+    args = parser.parse_args(argv)
+    run = load(args.run)
+    if args.candidate is None:
+        print(format_stats(function_stats(run)))
+        print()
+        print(format_timeline(*timeline(run, args.bin)))
+        return 0
+    rows = diff(function_stats(run), function_stats(load(args.candidate)), args.threshold, args.rate_threshold)
+    print(format_diff(rows))
+    return 1 if any(row[4] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+class Clock:
+    ''' Time source of the Pykron runtime
+
+    The timestamps of the tasks, their deadlines, the timeout timers and the
+    timed waits go through the clock of the Pykron instance. This one is
+    backed by time.perf_counter and threading.
+    '''
+
+    def now(self):
+        return time.perf_counter()
+
+    def sleep(self, delay):
+        time.sleep(delay)
+
+    def timer(self, delay, fn, args=()):
+        ''' returns a timer calling fn(*args) delay seconds after it is started,
+        with the start() and cancel() methods of threading.Timer
+        '''
+        return threading.Timer(delay, fn, args)
+
+    def wait(self, event, timeout=None):
+        return event.wait(timeout)
+
+class VirtualTimer:
+
+    def __init__(self, clock, delay, fn, args=()):
+        self._clock = clock
+        self._delay = delay
+        self._fn = fn
+        self._args = args
+        self._cancelled = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        # the timer stays in the heap of the clock until its deadline
+        self._cancelled = True
+        self._fn = None
+        self._args = ()
+
+    def run(self):
+        if not self._cancelled:
+            fn, args = self._fn, self._args
+            self.cancel()
+            fn(*args)
+
+    def start(self):
+        if self._delay <= 0:
+            self.run()
+        else:
+            self._clock.schedule(self, self._delay)
+
+class VirtualClock(Clock):
+    ''' Simulated time for tests
+
+    Time stands still until advance() is called, which runs the timers that
+    become due in deadline order, in the calling thread. Threads sleeping or
+    waiting on the clock wake up when their virtual deadline is reached; they
+    poll every POLL_INTERVAL (real) seconds so that Pykron can still stop them.
+    wait_sleepers() lets a test wait until the tasks under test are blocked on
+    the clock before advancing it.
+    '''
+
+    POLL_INTERVAL = 0.001
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self._cond = threading.Condition()
+        self._timers = []
+        self._seq = itertools.count()
+        self._sleepers = 0
+
+    @property
+    def sleepers(self):
+        return self._sleepers
+
+    def now(self):
+        return self._now
+
+    def advance(self, delta):
+        ''' moves the clock forward by delta seconds, firing the timers that
+        become due on the way
+        '''
+        if delta < 0:
+            raise ValueError("the clock cannot go backwards")
+        with self._cond:
+            end = self._now + delta
+        while True:
+            with self._cond:
+                if not self._timers or self._timers[0][0] > end:
+                    self._now = end
+                    return
+                when, seq, timer = heapq.heappop(self._timers)
+                self._now = max(self._now, when)
+            timer.run()
+
+    def schedule(self, timer, delay):
+        with self._cond:
+            heapq.heappush(self._timers, (self._now + delay, next(self._seq), timer))
+
+    def sleep(self, delay):
+        if delay <= 0:
+            return
+        self.wait(threading.Event(), delay)
+
+    def timer(self, delay, fn, args=()):
+        return VirtualTimer(self, delay, fn, args)
+
+    def wait(self, event, timeout=None):
+        if timeout is None:
+            return event.wait()
+        if event.is_set():
+            return True
+        expired = threading.Event()
+        timer = self.timer(timeout, expired.set)
+        # the timer is scheduled before the thread counts as a sleeper, so
+        # that advance() cannot run in between
+        with self._cond:
+            timer.start()
+            self._sleepers += 1
+            self._cond.notify_all()
+        try:
+            while not expired.is_set():
+                if event.wait(VirtualClock.POLL_INTERVAL):
+                    return True
+            return event.is_set()
+        finally:
+            timer.cancel()
+            with self._cond:
+                self._sleepers -= 1
+                self._cond.notify_all()
+
+    def wait_sleepers(self, n, timeout=None):
+        ''' waits (in real time) until at least n threads are sleeping or
+        waiting on the clock
+        '''
+        with self._cond:
+            return self._cond.wait_for(lambda: self._sleepers >= n, timeout)
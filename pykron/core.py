@@ -29,36 +29,78 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
-from threading import Thread
-from concurrent.futures import thread, ThreadPoolExecutor
-from inspect import getframeinfo, stack
+from concurrent.futures import ThreadPoolExecutor
+import collections
 import concurrent.futures
+import contextvars
+import functools
+import itertools
+import queue
 import threading
-import time
 import os
 import sys
-import csv
-import linecache
-import traceback
-import asyncio
+import time
 import logging
-import ctypes
 import inspect
-import concurrent
-
-from pykron.logging import PykronLogger
-from pykron.profiling import PykronProfiler
+import contextlib
+
+try:
+    import resource
+    RUSAGE_THREAD = getattr(resource, 'RUSAGE_THREAD', None)
+except ImportError:
+    RUSAGE_THREAD = None
+
+from pykron.admission import PykronAdmission
+from pykron.clock import Clock, VirtualClock
+from pykron.lanes import PykronLanes, current_lane
+from pykron.logging import PykronLogger, PykronLogSampler, PykronRepr
+from pykron.periodic import PeriodicLoop
+from pykron.pool import PykronPool, available_cpus
+from pykron.stream import TaskStream
+
+# request of the task running in the current context. Requests are run in a
+# copy of the context that dispatched them, so the variable follows the task
+# across executor threads, pooled workers and coroutines.
+_current_request = contextvars.ContextVar('pykron_request', default=None)
+# innermost TaskScope entered in the current context
+_current_scope = contextvars.ContextVar('pykron_scope', default=None)
+# task executing in the current thread, a pool worker waiting on a request
+# may run other tasks inline on top of it
+_running = threading.local()
+
+# execution of a completed task kept in the history, without the arguments
+# and the return value of the task
+TaskRecord = collections.namedtuple('TaskRecord', 'task_id parent_id name func_name func_loc caller_name caller_loc status exception priority key '
+                                    'arrival_ts start_ts end_ts duration idle_time cpu_time wait_time voluntary_switches involuntary_switches allocated peak_allocated')
+
+@functools.lru_cache(maxsize=4096)
+def location(filename, lineno):
+    return "[%s:%d]" % (os.path.relpath(filename), lineno)
+
+def thread_usage():
+    ''' CPU time, voluntary and involuntary context switches of the calling
+    thread. The switches are None where getrusage(RUSAGE_THREAD) is not
+    available (e.g. macOS, Windows).
+    '''
+    if RUSAGE_THREAD is None:
+        return time.thread_time(), None, None
+    usage = resource.getrusage(RUSAGE_THREAD)
+    return time.thread_time(), usage.ru_nvcsw, usage.ru_nivcsw
+
+def usage_delta(end, start):
+    return tuple(None if e is None else e - s for e, s in zip(end, start))
 
 class Task:
 
     FAILED     = 'FAILED'
     IDLE       = 'IDLE'
     CANCELLED  = 'CANCELLED'
+    REJECTED   = 'REJECTED'
     RUNNING    = 'RUNNING'
     SUCCEED    = 'SUCCEED'
     TIMEOUT    = 'TIMEOUT'
 
-    def __init__(self, task_id, target, args, kwargs, parent_id):
+    def __init__(self, task_id, target, args, kwargs, parent_id, deadline=None, priority=0, caller_depth=2, key=None):
         self._target = target
         self._args = args
         self._kwargs = kwargs
@@ -68,20 +110,40 @@ class Task:
         self._end_ts = None
         self._duration = None
         self._exception = None
-        self._arrival_ts = time.perf_counter()
+        self._clock = Pykron.getInstance().clock
+        self._arrival_ts = self._clock.now()
         self._logger = Pykron.getInstance().logger
+        self._recorder = Pykron.getInstance().flight_recorder
         self._parent_id = parent_id
-        self._func_name = self._target.__name__
+        self._func_name = getattr(self._target, '__name__', type(self._target).__name__)
         self._task_id = task_id
+        self._thread_id = None
+        self._deadline = deadline
+        self._priority = priority
+        self._key = key
         self._timeout = False
         self._profiler = None
+        self._stream = None
+        self._sampled = False
+        self._usage = (None, None, None)
+        self._inline_usage = (0.0, 0, 0)
+        self._wait_time = 0.0
+        self._allocated = None
+        self._peak_allocated = None
         self._name = self._func_name
-        self._caller_frame = stack()[2][0]
-        caller_module = inspect.getmodule(self._caller_frame.f_code)
-        caller_info = getframeinfo(self._caller_frame)
-        self._func_loc = "[%s:%d]" % (os.path.relpath(inspect.getsourcefile(self._target)), inspect.getsourcelines(self._target)[1]+1)
-        self._caller_name = caller_info.function
-        self._caller_loc = "[%s:%d]" % (os.path.relpath(caller_info.filename), caller_info.lineno)
+        # only the location strings are kept, a reference to the frame would
+        # keep all the locals of the caller alive
+        caller_frame = sys._getframe(caller_depth)
+        self._caller_name = caller_frame.f_code.co_name
+        self._caller_loc = location(caller_frame.f_code.co_filename, caller_frame.f_lineno)
+        del caller_frame
+        func = inspect.unwrap(self._target)
+        code = getattr(func, '__code__', None)
+        if code is not None:
+            self._func_loc = location(code.co_filename, code.co_firstlineno + 1)
+        else:
+            # builtins and callables without python source
+            self._func_loc = "[%s]" % getattr(func, '__module__', None)
         self._started = threading.Event()
 
     @property
@@ -92,6 +154,13 @@ class Task:
     def kwargs(self):
         return self._kwargs
 
+    @property
+    def allocated(self):
+        ''' net bytes allocated while the task ran (memory_profiling), None
+        if not profiled
+        '''
+        return self._allocated
+
     @property
     def arrival_ts(self):
         return self._arrival_ts
@@ -104,6 +173,17 @@ class Task:
     def caller_name(self):
         return self._caller_name
 
+    @property
+    def cpu_time(self):
+        ''' CPU time (seconds) consumed by the thread running the task, None
+        until the task returns
+        '''
+        return self._usage[0]
+
+    @property
+    def deadline(self):
+        return self._deadline
+
     @property
     def duration(self):
         return self._end_ts - self._start_ts
@@ -112,6 +192,10 @@ class Task:
     def end_ts(self):
         return self._end_ts
 
+    @property
+    def expired(self):
+        return self._deadline is not None and self._clock.now() >= self._deadline
+
     @property
     def exception(self):
         return self._exception
@@ -128,6 +212,18 @@ class Task:
     def idle_time(self):
         return self._start_ts - self._arrival_ts
 
+    @property
+    def key(self):
+        ''' key of the lane running the task, None if it is not keyed '''
+        return self._key
+
+    @property
+    def involuntary_switches(self):
+        ''' times the task was preempted (e.g. more runnable threads than
+        CPUs), None if not available
+        '''
+        return self._usage[2]
+
     @property
     def logging(self):
         return self._logger.log
@@ -136,6 +232,17 @@ class Task:
     def parent_id(self):
         return self._parent_id
 
+    @property
+    def peak_allocated(self):
+        ''' peak of the bytes allocated while the task ran (memory_profiling),
+        None if other tasks ran at the same time
+        '''
+        return self._peak_allocated
+
+    @property
+    def priority(self):
+        return self._priority
+
     @property
     def profiler(self):
         return self._profiler
@@ -144,6 +251,12 @@ class Task:
     def name(self):
         return self._name
 
+    @property
+    def remaining(self):
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - self._clock.now())
+
     @property
     def retval(self):
         return self._retval
@@ -160,6 +273,14 @@ class Task:
     def started(self):
         return self._started
 
+    @property
+    def stream(self):
+        return self._stream
+
+    @property
+    def target(self):
+        return self._target
+
     @property
     def task_id(self):
         return self._task_id
@@ -168,48 +289,164 @@ class Task:
     def thread_id(self):
         return self._thread_id
 
+    @property
+    def voluntary_switches(self):
+        ''' times the task gave up the CPU (I/O, locks, waiting for the GIL),
+        None if not available
+        '''
+        return self._usage[1]
+
+    @property
+    def wait_time(self):
+        ''' time spent in the Pykron wait primitives, i.e. waiting for other
+        requests. The time neither on CPU nor waiting was spent blocked on I/O,
+        sleeping or waiting for the GIL.
+        '''
+        return self._wait_time
+
     @property
     def current_thread(self):
         return threading.current_thread()
 
     def finalize(self, future):
-        self._end_ts = time.perf_counter()
+        import asyncio
+        self._end_ts = self._clock.now()
+        if self._start_ts is None:
+            self._start_ts = self._end_ts
+        if self._stream:
+            self._stream.close()
         try:
             self._retval = future.result()
             self._status = Task.SUCCEED
         except asyncio.CancelledError:
             if self._timeout:
-                self.logging.error("T%d: TIMEOUT OCCURRED! %s(%s) <- %s(%s)" % (self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name))
+                self.logging.error("T%d: TIMEOUT OCCURRED! %s(%s) <- %s(%s)", self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name)
                 self._status = Task.TIMEOUT
             else:
                 self._status = Task.CANCELLED
-                self.logging.error("T%d: TASK CANCELLED! %s(%s) <- %s(%s)" % (self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name))
+                self.logging.error("T%d: TASK CANCELLED! %s(%s) <- %s(%s)", self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name)
         except Exception as e:
+            import traceback
             exc_type, exc_obj, tb = sys.exc_info()
             f = traceback.extract_tb(tb)[-1]
+            # the locals of the failed frames are not needed anymore
+            traceback.clear_frames(tb)
             lineno = f.lineno
             filename = f.filename
             self._exception = "%s Line: %s,  File: %s" % (e, lineno, filename)
             self._status = Task.FAILED
-            self.logging.error("T%d: TASK FAILED! Exception: %s" % (self.task_id, self._exception))
-        self.logging.debug("T%d: TASK COMPLETED! Status: %s, Duration: %.3f %s(%s) <- %s(%s)" % (self.task_id, self.status, self.duration, self.func_loc, self.func_name, self.caller_loc, self.caller_name))
-
+            self.logging.error("T%d: TASK FAILED! Exception: %s", self.task_id, self._exception)
+        if self._sampled:
+            self.logging.debug("T%d: TASK COMPLETED! Status: %s, Duration: %.3f %s(%s) <- %s(%s)", self.task_id, self.status, self.duration, self.func_loc, self.func_name, self.caller_loc, self.caller_name)
+        if self._recorder:
+            self._recorder.finish(self)
+            if self._status in (Task.TIMEOUT, Task.FAILED) and self._recorder.dump("T%d %s" % (self.task_id, self._status), force=False):
+                self.logging.error("T%d: flight recorder dumped to %s", self.task_id, self._recorder.path)
+
+
+    def reject(self, status):
+        if self._stream:
+            self._stream.close()
+        self._start_ts = self._clock.now()
+        self._end_ts = self._start_ts
+        self._status = status
+        if status == Task.TIMEOUT:
+            self._timeout = True
+        if self._recorder:
+            self._recorder.reject(self)
+        self.logging.error("T%d: TASK REJECTED! Status: %s %s(%s) <- %s(%s)", self.task_id, self.status, self.func_loc, self.func_name, self.caller_loc, self.caller_name)
+
+    def add_wait_time(self, delay):
+        self._wait_time += delay
 
     def run(self):
+        app = Pykron.getInstance()
         self._thread_id = threading.current_thread().ident
-        Pykron.getInstance().set_thread_id(self.thread_id, self.task_id)
-        self.logging.debug("T%d: TASK STARTED! %s(%s) <- %s(%s)" % (self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name))
-        self._start_ts = time.perf_counter()
-        self.started.set()
-        self._status = Task.RUNNING
-        if self._profiler:
-            res = self._profiler.runcall(self._target, *self._args, **self._kwargs)
-        else:
-            res = self._target(*self._args, **self._kwargs)
-        return res
+        outer = getattr(_running, 'task', None)
+        _running.task = self
+        app.enterTask(self)
+        usage = thread_usage()
+        memory = app.memory_profiler
+        if self._recorder:
+            self._recorder.start(self)
+        try:
+            self._sampled = self._logger.sample(self)
+            if self._sampled:
+                self.logging.debug("T%d: TASK STARTED! %s(%s) <- %s(%s)", self.task_id, self.func_loc, self.func_name, self.caller_loc, self.caller_name)
+            self._start_ts = self._clock.now()
+            self.started.set()
+            self._status = Task.RUNNING
+            app.task_started(self)
+            if memory:
+                memory.task_started(self)
+            if self._profiler:
+                res = self._profiler.runcall(self._target, *self._args, **self._kwargs)
+            else:
+                res = self._target(*self._args, **self._kwargs)
+            if self._stream:
+                if inspect.isasyncgen(res):
+                    import asyncio
+                    res = asyncio.run(self.drain_async(res))
+                else:
+                    res = self.drain(res)
+            return res
+        finally:
+            if self._stream:
+                self._stream.close()
+            if memory:
+                memory.task_completed(self)
+            # the usage of the tasks run inline while waiting is not ours
+            usage = usage_delta(thread_usage(), usage)
+            self._usage = usage_delta(usage, self._inline_usage)
+            _running.task = outer
+            app.exitTask(self)
+            if outer is not None:
+                outer._inline_usage = tuple(None if u is None else i + u for i, u in zip(outer._inline_usage, usage))
+
+    def drain(self, generator):
+        ''' forwards the items of the generator to the stream, the return value
+        of the generator becomes the return value of the task
+        '''
+        while True:
+            try:
+                item = next(generator)
+            except StopIteration as e:
+                return e.value
+            if not self._stream.put(item):
+                generator.close()
+                return None
+
+    async def drain_async(self, generator):
+        async for item in generator:
+            if not self._stream.put(item):
+                break
+        await generator.aclose()
+
+    def set_caller(self, name, loc):
+        self._caller_name = name
+        self._caller_loc = loc
+
+    def set_args(self, args, kwargs):
+        self._args = args
+        self._kwargs = kwargs
+
+    def set_deadline(self, deadline):
+        self._deadline = deadline
+
+    def record(self):
+        return TaskRecord(*(getattr(self, field) for field in TaskRecord._fields))
+
+    def set_memory(self, allocated, peak_allocated):
+        self._allocated = allocated
+        self._peak_allocated = peak_allocated
+
+    def set_stream(self, stream):
+        self._stream = stream
 
     def set_timeout(self):
         self._timeout = True
+        if self._recorder:
+            self._recorder.timeout(self)
 
     def set_profiler(self, profiler):
         self._profiler = profiler
@@ -218,6 +455,8 @@ class Pykron:
 
     _instance = None
     TIMEOUT_DEFAULT = 30.0
+    MAP_CHUNKSIZE_DEFAULT = 64
+    HISTORY_SIZE_DEFAULT = 1000
 
     FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
     FORMAT_VERBOSE = '%(asctime)s - %(levelname)s - %(module)s - %(process)d - %(thread)d - %(message)s'
@@ -227,37 +466,152 @@ class Pykron:
     LOGGING_PATH = '.'
 
     @staticmethod
-    def AsyncRequest(timeout=TIMEOUT_DEFAULT, callback=None, cancel_propagation=True):
+    def AsyncRequest(timeout=TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0, stream_buffer=TaskStream.BUFFER_DEFAULT, key=None):
+        ''' decorates target so that calling it returns an AsyncRequest. With
+        key, a function of the args tuple, the requests with the same key
+        run serially in submission order on a dedicated lane, see PykronLanes.
+        '''
         def wrapper(target):
+                streaming = inspect.isgeneratorfunction(target) or inspect.isasyncgenfunction(target)
                 def f(*args, **kwargs):
-                    parent_id = threading.current_thread().ident
-                    task = Task(task_id=Pykron.getInstance().createTaskId(),
+                    app = Pykron.getInstance()
+                    parent = _current_request.get()
+                    task = Task(task_id=app.createTaskId(),
                             target=target,
                             args=args,
                             kwargs=kwargs,
-                            parent_id=parent_id)
-                    return Pykron.getInstance().createRequest(task, timeout, callback, cancel_propagation)
+                            parent_id=parent.task.task_id if parent else None,
+                            deadline=app.createDeadline(parent, timeout),
+                            priority=priority,
+                            key=key(args) if key else None)
+                    if streaming:
+                        task.set_stream(TaskStream(stream_buffer))
+                    return app.createRequest(task, timeout, callback, cancel_propagation)
+                return f
+        return wrapper
+
+    @staticmethod
+    def Periodic(period, overrun=PeriodicLoop.SKIP, iterations=None, timeout=None, callback=None, cancel_propagation=True, priority=0):
+        def wrapper(target):
+                def f(*args, **kwargs):
+                    app = Pykron.getInstance()
+                    parent = _current_request.get()
+                    periodic = PeriodicLoop(target, period, overrun, iterations, app.clock)
+                    task = Task(task_id=app.createTaskId(),
+                            target=periodic.runner,
+                            args=args,
+                            kwargs=kwargs,
+                            parent_id=parent.task.task_id if parent else None,
+                            deadline=app.createDeadline(parent, timeout),
+                            priority=priority)
+                    return app.createRequest(task, timeout, callback, cancel_propagation, periodic)
                 return f
         return wrapper
 
+    @staticmethod
+    def allocate_shared(size):
+        ''' allocates a SharedBuffer from the pool of shared memory segments.
+        When called from a task the buffer is released as soon as the task
+        completes, unless it has been detached or it is still referenced by
+        the return value (also through a tuple, list or dict, or through a
+        view such as buf or as_array()). A buffer passed to a request still
+        running at that point is handed over to it. Any other view or
+        reference kept after the task completes points to memory that the
+        pool will reuse: detach() the buffer to keep it.
+        '''
+        return Pykron.getInstance().bindShared(Pykron.getInstance().shm.allocate(size))
+
+    @staticmethod
+    def share(obj):
+        ''' copies a buffer-protocol object into a SharedBuffer, see
+        allocate_shared()
+        '''
+        return Pykron.getInstance().bindShared(Pykron.getInstance().shm.share(obj))
+
+    @staticmethod
+    def map(func, iterable, chunksize=MAP_CHUNKSIZE_DEFAULT, ordered=True, timeout=TIMEOUT_DEFAULT, priority=0, inflight=None):
+        ''' runs func on each item of iterable, chunksize items per request.
+        The returned MapRequest yields the return values lazily, in input
+        order or as the chunks complete, and records the status of each item.
+        The timeout applies to each chunk. At most inflight chunks run at
+        once, twice the maximum number of pool workers by default.
+        '''
+        return MapRequest(Pykron.getInstance(), func, iterable, chunksize, ordered, timeout, priority, inflight)
+
+    @staticmethod
+    def all(requests):
+        ''' groups the requests so that a continuation can be scheduled once
+        all of them are completed
+        '''
+        return RequestGroup(requests)
+
     @staticmethod
     def close():
         app = Pykron.getInstance()
         app.wait_all_completed()
         app.save_csv()
-        app.loop.call_soon_threadsafe(app.loop.stop)
-        app._worker_thread.join()
+        if app._loop is not None:
+            app._loop.call_soon_threadsafe(app._loop.stop)
+            app._worker_thread.join()
+            app._loop.close()
+        if app._pool:
+            app._pool.shutdown(wait=False, cancel_futures=True)
+        if app._lanes:
+            app._lanes.shutdown()
+        if app._shm:
+            app._shm.close()
+        if app._monitor:
+            app._monitor.close()
+        if app._flight_recorder:
+            app._flight_recorder.close()
+        app._logger.close()
         Pykron._instance = None
 
+    @staticmethod
+    def current_task():
+        ''' returns the Task running in the calling context, None if it is not
+        called from a task
+        '''
+        req = _current_request.get()
+        if req is None:
+            return None
+        return req.task
+
     @staticmethod
     def getInstance():
         if Pykron._instance == None:
             Pykron()
         return Pykron._instance
 
+    @staticmethod
+    def remaining_time():
+        ''' returns the time budget (in seconds) left to the calling task,
+        None if it is not called from a task
+        '''
+        task = Pykron.current_task()
+        if task is None:
+            return None
+        return task.remaining
+
+    @staticmethod
+    def scope(timeout=None):
+        ''' returns a TaskScope, to be used as context manager. The requests
+        created in the with block, and the ones spawned by their tasks, are
+        joined when leaving it and cancelled together on failure or timeout.
+        '''
+        return TaskScope(Pykron.getInstance(), timeout)
+
+    @staticmethod
+    def sleep(delay):
+        ''' sleeps on the clock of the Pykron instance, with a virtual clock
+        the delay elapses when the clock is advanced
+        '''
+        Pykron.getInstance().clock.sleep(delay)
+
     @staticmethod
     def stop_thread(tid, exctype):
         """raises the exception, performs cleanup if needed"""
+        import ctypes
         if not inspect.isclass(exctype):
             raise TypeError("Only types can be raised (not instances)")
         res = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), ctypes.py_object(exctype))
@@ -281,22 +635,107 @@ class Pykron:
                 return_values.append(None)
         return return_values
 
-    def __init__(self, logging_level=LOGGING_LEVEL, logging_format=FORMAT, logging_file=False, logging_path=LOGGING_PATH, save_csv=False, profiling=False):
+    def __init__(self, logging_level=LOGGING_LEVEL, logging_format=FORMAT, logging_file=False, logging_path=LOGGING_PATH, save_csv=False, profiling=False, admission_control=False, pool=False, repr_maxlen=PykronRepr.MAXLEN_DEFAULT, repr_maxlevel=PykronRepr.MAXLEVEL_DEFAULT, lazy_repr=False,
+                 logging_queue_size=PykronLogger.QUEUE_SIZE_DEFAULT, logging_max_bytes=0, logging_backup_count=5, logging_rotate_when=None, save_journal=False, log_sampling=False, virtual_clock=False, monitor=False, history_size=HISTORY_SIZE_DEFAULT, memory_profiling=False,
+                 flight_recorder=False):
         if Pykron._instance != None:
             raise Exception("This class is a singleton!")
         else:
             Pykron._instance = self
-            self._logger = PykronLogger(logging_level, logging_format, logging_file, logging_path, save_csv)
+            if log_sampling is True:
+                log_sampling = PykronLogSampler()
+            self._logger = PykronLogger(logging_level, logging_format, logging_file, logging_path, save_csv, repr_maxlen, repr_maxlevel, lazy_repr,
+                                        logging_queue_size, logging_max_bytes, logging_backup_count, logging_rotate_when, save_journal,
+                                        log_sampling or None)
+            if virtual_clock is True:
+                self._clock = VirtualClock()
+            elif virtual_clock:
+                self._clock = virtual_clock
+            else:
+                self._clock = Clock()
             self._requests = {}
-            self._thread_ids = {}
+            self._thread_lock = threading.Lock()
+            self._thread_tasks = {}
+            self._interrupts = {}
             self._task_nr = 0
+            self._completed = 0
+            self._rejected = 0
+            self._busy_time = 0.0
+            self._cpu_time = 0.0
+            self._wait_time = 0.0
+            self._history = collections.deque(maxlen=history_size)
             if profiling:
+                from pykron.profiling import PykronProfiler
                 self._profiler = PykronProfiler()
             else:
                 self._profiler = None
-            self.loop = asyncio.get_event_loop()
-            self._worker_thread = threading.Thread(target=self.worker, daemon=True)
-            self._worker_thread.start()
+            if flight_recorder is True:
+                from pykron.recorder import FlightRecorder
+                self._flight_recorder = FlightRecorder()
+            elif flight_recorder:
+                self._flight_recorder = flight_recorder
+            else:
+                self._flight_recorder = None
+            if memory_profiling is True:
+                from pykron.profiling import PykronMemoryProfiler
+                self._memory_profiler = PykronMemoryProfiler()
+            elif memory_profiling:
+                self._memory_profiler = memory_profiling
+            else:
+                self._memory_profiler = None
+            if admission_control is True:
+                self._admission = PykronAdmission()
+            elif admission_control:
+                self._admission = admission_control
+            else:
+                self._admission = None
+            if pool is True:
+                self._pool = PykronPool()
+            elif pool:
+                self._pool = pool
+            else:
+                self._pool = None
+            if self._pool:
+                self._pool.attach(self._clock)
+            if self._admission:
+                self._admission.attach(self._clock, (lambda: self._pool.queue_age) if self._pool else None)
+            self._shm = None
+            self._lanes = None
+            self._shared = {}
+            self._loop = None
+            self._worker_thread = None
+            self._start_lock = threading.Lock()
+            if monitor:
+                from pykron.monitor import PykronMonitor
+                self._monitor = PykronMonitor(self, None if monitor is True else monitor)
+            else:
+                self._monitor = None
+
+    @property
+    def admission(self):
+        return self._admission
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def flight_recorder(self):
+        return self._flight_recorder
+
+    @property
+    def history(self):
+        ''' the TaskRecord of the most recent completed tasks, oldest first
+        '''
+        return list(self._history)
+
+    @property
+    def lanes(self):
+        if self._lanes is None:
+            with self._start_lock:
+                if self._lanes is None:
+                    self._lanes = PykronLanes()
+        return self._lanes
 
     @property
     def logging(self):
@@ -306,23 +745,323 @@ class Pykron:
     def logger(self):
         return self._logger
 
-    def worker(self):
-        self.loop.run_forever()
+    @property
+    def loop(self):
+        if self._loop is None:
+            self.start()
+        return self._loop
+
+    @property
+    def memory_profiler(self):
+        return self._memory_profiler
+
+    @property
+    def monitor(self):
+        return self._monitor
+
+    @property
+    def pool(self):
+        return self._pool
+
+    @property
+    def running(self):
+        return self._loop is not None and self._loop.is_running()
+
+    @property
+    def shm(self):
+        if self._shm is None:
+            from pykron.shm import SegmentPool
+            self._shm = SegmentPool()
+        return self._shm
+
+    def bindShared(self, shared, task=None):
+        if task is None:
+            task = Pykron.current_task()
+        if task is not None:
+            shared.bind(task.task_id)
+            self._shared.setdefault(task.task_id, []).append(shared)
+        return shared
+
+    def releaseShared(self, task):
+        buffers = [shared for shared in self._shared.pop(task.task_id, []) if shared.task_id == task.task_id]
+        if not buffers:
+            return
+        from pykron.shm import references
+        returned = list(references(task.retval))
+        for shared in buffers:
+            if any(shared.backs(obj) for obj in returned):
+                shared.detach()
+                continue
+            holder = self.sharedHolder(shared, task)
+            if holder is not None:
+                self.bindShared(shared, holder)
+            else:
+                shared.release()
+
+    def sharedHolder(self, shared, task):
+        ''' a pending or running task, other than task, whose arguments
+        reference the shared buffer
+        '''
+        from pykron.shm import references
+        for req in list(self._requests.values()):
+            other = req.task
+            if other is task or other.status not in (Task.IDLE, Task.RUNNING):
+                continue
+            if any(shared.backs(obj) for obj in references((other.args, other.kwargs))):
+                return other
+        return None
+
+    @contextlib.contextmanager
+    def blocking(self):
+        ''' context manager wrapping the Pykron wait primitives, it lets the
+        pool compensate for the workers blocked waiting on other requests and
+        adds the time to the wait_time of the calling task
+        '''
+        req = _current_request.get()
+        start = self._clock.now()
+        try:
+            with self._pool.blocking() if self._pool else contextlib.nullcontext():
+                yield
+        finally:
+            if req is not None:
+                req.task.add_wait_time(self._clock.now() - start)
+
+    def createExecutor(self, task):
+        if task.key is not None:
+            return self.lanes.executor(task.key)
+        if self._pool:
+            return self._pool
+        return ThreadPoolExecutor()
+
+    def wait(self, request, timeout=None):
+        ''' waits for the request to complete. When called from a pool worker
+        the waiting thread runs the awaited request inline if it is still
+        queued, so that nested waits cannot exhaust the pool.
+        '''
+        if request.task.key is not None and request.task.key == current_lane() and not request.completed.is_set():
+            raise RuntimeError("T%d would wait forever for T%d, queued on the same lane %r" % (Pykron.current_task().task_id, request.task.task_id, request.task.key))
+        if self._pool is not None and self._pool.is_worker() and request._cfuture is not None:
+            if self._pool.run_inline(request._cfuture):
+                self.raiseInterrupt(Pykron.current_task())
+                # only the completion callback on the loop is left, the pool
+                # must not compensate for it
+                return self._clock.wait(request.completed, timeout)
+        with self.blocking():
+            return self._clock.wait(request.completed, timeout)
+
+    def enterTask(self, task):
+        with self._thread_lock:
+            self._thread_tasks.setdefault(task.thread_id, []).append(task)
+
+    def exitTask(self, task):
+        with self._thread_lock:
+            stack = self._thread_tasks.get(task.thread_id)
+            if stack and stack[-1] is task:
+                stack.pop()
+                if not stack:
+                    del self._thread_tasks[task.thread_id]
+            self._interrupts.pop(task.task_id, None)
+
+    def interrupt(self, task, error):
+        ''' raises error in the thread running task. The tasks run inline by
+        a waiting pool worker share its thread: while task waits for one of
+        them the error is only recorded, and raised by raiseInterrupt() once
+        the inline task returns. Nothing is raised once task has returned.
+        '''
+        with self._thread_lock:
+            stack = self._thread_tasks.get(task.thread_id)
+            if not stack or task not in stack:
+                return
+            self._interrupts[task.task_id] = error
+            if stack[-1] is task:
+                Pykron.stop_thread(task.thread_id, error)
+
+    def raiseInterrupt(self, task):
+        ''' raises the error recorded by interrupt() for task, if any '''
+        if task is None:
+            return
+        with self._thread_lock:
+            error = self._interrupts.pop(task.task_id, None)
+        if error is not None:
+            raise error()
+
+    def snapshot(self):
+        ''' returns a JSON serialisable view of the runtime: the pending tasks
+        (queued ones have status IDLE), the pool occupancy, the number of
+        armed timeout timers and the completion counters
+        '''
+        now = self._clock.now()
+        tasks = []
+        timers = 0
+        for req in list(self._requests.values()):
+            task = req.task
+            if req._timeout_thread is not None:
+                timers += 1
+            tasks.append({
+                'task_id': task.task_id,
+                'parent_id': task.parent_id,
+                'func_name': task.func_name,
+                'func_loc': task.func_loc,
+                'status': task.status,
+                'thread_id': task.thread_id,
+                'age': now - task.arrival_ts,
+                'remaining': task.remaining})
+        pool = None
+        if self._pool:
+            pool = {
+                'workers': self._pool.workers,
+                'busy': self._pool.busy,
+                'idle': self._pool.idle,
+                'blocked': self._pool.blocked,
+                'queued': self._pool.queued,
+                'queue_delay': self._pool.queue_delay}
+        return {
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+            'tasks': tasks,
+            'pool': pool,
+            'timers': timers,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'busy_time': self._busy_time,
+            'cpu_time': self._cpu_time,
+            'wait_time': self._wait_time}
+
+    def start(self):
+        ''' starts the event loop thread. It is called on the first request,
+        so that modules only decorating functions do not start the runtime.
+        '''
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            import asyncio
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+            loop.call_soon(started.set)
+            self._worker_thread = threading.Thread(target=self.worker, args=(loop,), daemon=True)
+            self._worker_thread.start()
+            started.wait()
+            self._loop = loop
+
+    def reinitialize(self):
+        ''' resets the runtime in a forked child. The threads of the parent do
+        not exist in the child: its requests are dropped and the loop, the pool
+        and the log listener are recreated on demand.
+        '''
+        self._loop = None
+        self._worker_thread = None
+        self._start_lock = threading.Lock()
+        self._requests = {}
+        self._thread_lock = threading.Lock()
+        self._thread_tasks = {}
+        self._interrupts = {}
+        self._shared = {}
+        # the socket belongs to the parent
+        self._monitor = None
+        if self._pool:
+            self._pool.reinitialize()
+        if self._shm:
+            self._shm.reinitialize()
+        if self._lanes:
+            self._lanes.reinitialize()
+        if self._flight_recorder:
+            self._flight_recorder.reinitialize()
+        self._logger.reinitialize()
+
+    def worker(self, loop):
+        loop.run_forever()
         if self._profiler:
             self._profiler.saveStats()
+        if self._memory_profiler:
+            self._memory_profiler.saveStats()
 
-    def createRequest(self, task, timeout, callback, cancel_propagation):
+    def createRequest(self, task, timeout, callback, cancel_propagation, periodic=None):
         if self._profiler:
             self._profiler.addTask(task)
-        req = AsyncRequest(self, task, timeout, callback, cancel_propagation)
+        if self._memory_profiler:
+            self._memory_profiler.addTask(task)
+        if periodic is None:
+            req = AsyncRequest(self, task, timeout, callback, cancel_propagation)
+        else:
+            req = PeriodicRequest(self, task, timeout, periodic, callback, cancel_propagation)
+        return req
+
+    def admission_status(self, task):
+        if task.expired:
+            return Task.TIMEOUT
+        if self._admission and not self._admission.admit(task.priority):
+            return Task.REJECTED
+        return None
+
+    def continueWith(self, requests, target, unpack=False, timeout=TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0):
+        ''' creates a request running target once all the given requests are
+        completed, no thread is kept waiting in the meantime. The target gets
+        the list of the return values, or each of them as positional argument
+        if unpack is True. If any of the requests does not succeed the
+        continuation is not dispatched and it ends as Task.CANCELLED.
+        '''
+        task = Task(task_id=self.createTaskId(),
+                target=target,
+                args=(),
+                kwargs={},
+                parent_id=None,
+                priority=priority,
+                caller_depth=3)
+        req = AsyncRequest(self, task, timeout, callback, cancel_propagation, deferred=True)
+        # the continuation is dispatched from the loop thread, outside of the
+        # context creating it
+        parent = _current_request.get()
+        scope = _current_scope.get()
+        requests = list(requests)
+        pending = [len(requests)]
+        lock = threading.Lock()
+
+        def on_input_completed(done):
+            with lock:
+                pending[0] -= 1
+                if pending[0] > 0:
+                    return
+            if req.completed.is_set():
+                return
+            if any(r.task.status != Task.SUCCEED for r in requests):
+                self.request_rejected(req, Task.CANCELLED)
+                return
+            retvals = [r.task.retval for r in requests]
+            task.set_deadline(self.createDeadline(parent, timeout, scope))
+            if unpack:
+                req.dispatch(tuple(retvals))
+            else:
+                req.dispatch((retvals,))
+
+        if len(requests) == 0:
+            task.set_deadline(self.createDeadline(parent, timeout, scope))
+            req.dispatch()
+        for r in requests:
+            r.add_done_callback(on_input_completed)
         return req
 
+    def createDeadline(self, parent, timeout, scope=None):
+        ''' deadline of a request created by the parent request (None outside
+        of a task), it never exceeds the deadline of the parent nor the one
+        of the enclosing scope (by default the scope of the calling context)
+        '''
+        deadline = None
+        if timeout is not None:
+            deadline = self._clock.now() + timeout
+        if scope is None:
+            scope = _current_scope.get()
+        for bound in (parent.task.deadline if parent else None, scope.deadline if scope else None):
+            if bound is not None:
+                deadline = bound if deadline is None else min(deadline, bound)
+        return deadline
+
     def createTaskId(self):
         self._task_nr += 1
         return self._task_nr
 
-    def set_thread_id(self, thread_id, task_id):
-        self._thread_ids[thread_id] = task_id
+    def task_started(self, task):
+        if self._admission:
+            self._admission.observe(task.idle_time)
 
     def set_req_id(self, req_id, req):
         self._requests[req_id] = req
@@ -334,26 +1073,47 @@ class Pykron:
             task.finalize(request.future)
         request.stop_timeout_handler()
         if task.status != Task.SUCCEED:
-            if threading.main_thread().ident != task.parent_id:
-                parent_req = self.getRequest(self._thread_ids[task.parent_id])
-                if parent_req.cancel_propagation:
-                    parent_req.cancel()
-        request.set_completed()
+            parent_req = self._requests.get(task.parent_id)
+            if parent_req is not None and parent_req.cancel_propagation:
+                if self._flight_recorder:
+                    self._flight_recorder.propagate(task, parent_req.task.task_id)
+                parent_req.cancel()
         request._retval = task.retval
+        self._completed += 1
+        self._busy_time += task.duration
+        self._cpu_time += task.cpu_time or 0.0
+        self._wait_time += task.wait_time
+        self._history.append(task.record())
+        self.releaseShared(task)
+        request.set_completed()
         if request._callback:
             threading.Thread(target=request._callback, args=(request._task,)).start()
         if self._logger:
-            threading.Thread(target=self._logger.log_execution, args=(task,)).start()
-        if sys.version_info >= (3,9):
-            request.executor.shutdown(wait=False, cancel_futures=True)
-        else:
-            request.executor.shutdown(wait=False)
-        self._thread_ids.pop(task.thread_id)
+            self._logger.log_execution(task)
+        if request.executor is not self._pool and request.task.key is None:
+            if sys.version_info >= (3,9):
+                request.executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                request.executor.shutdown(wait=False)
         self._requests.pop(req_id)
 
     def getRequest(self, req_id):
         return self._requests[req_id]
 
+    def request_rejected(self, request, status):
+        task = request.task
+        if request._future is None:
+            request._future = concurrent.futures.Future()
+            request._future.cancel()
+        task.reject(status)
+        self._rejected += 1
+        self._history.append(task.record())
+        request.set_completed()
+        if request._callback:
+            threading.Thread(target=request._callback, args=(task,)).start()
+        if self._logger:
+            self._logger.log_execution(task)
+
     def save_csv(self):
         if self._logger:
             self._logger.save_csv()
@@ -366,7 +1126,7 @@ class Pykron:
 
 class AsyncRequest:
 
-    def __init__(self, app, task, timeout, callback=None, cancel_propagation=False):
+    def __init__(self, app, task, timeout, callback=None, cancel_propagation=False, deferred=False):
         self._app = app
         self._task = task
         self._timeout = timeout
@@ -376,12 +1136,45 @@ class AsyncRequest:
         self._cancel_propagation = cancel_propagation
         self._logger = app.logger
         self._completed = threading.Event()
-        self._executor = ThreadPoolExecutor()
+        self._lock = threading.Lock()
+        self._continuations = []
+        self._executor = None
+        self._future = None
+        self._cfuture = None
+        self._timeout_thread = None
+        self._deferred = deferred
+        self._scope = _current_scope.get()
+        if self._scope is not None:
+            self._scope.add(self)
+        if not deferred:
+            self.dispatch()
+
+    def dispatch(self, args=None, kwargs=None):
+        if args is not None:
+            self.task.set_args(args, kwargs or {})
+        status = self._app.admission_status(self.task)
+        if self._scope is not None and self._scope.cancelled:
+            status = Task.CANCELLED
+        if status is not None:
+            self._app.request_rejected(self, status)
+            return
+        self._executor = self._app.createExecutor(self.task)
         Pykron.getInstance().set_req_id(self.task.task_id, self)
-        self._future = self._loop.run_in_executor(self.executor, self.task.run)
-        self._future.add_done_callback(self.on_completed)
-        self._timeout_thread = threading.Timer(timeout, self.timeout_cb)
-        self._timeout_thread.start()
+        # the timer exists before the task can complete, so that completion
+        # always finds it to cancel. A cancelled timer that is started later
+        # returns immediately.
+        timer = None
+        if self.task.deadline is not None:
+            timer = self._app.clock.timer(self.task.remaining, self.timeout_cb)
+            self._timeout_thread = timer
+        if self._app.flight_recorder:
+            self._app.flight_recorder.submit(self.task)
+        self._cfuture = self.executor.submit(contextvars.copy_context().run, self.run)
+        import asyncio
+        self._future = asyncio.wrap_future(self._cfuture, loop=self._loop)
+        self._cfuture.add_done_callback(self.on_completed)
+        if timer is not None:
+            timer.start()
 
     @property
     def cancel_propagation(self):
@@ -391,6 +1184,10 @@ class AsyncRequest:
     def completed(self):
         return self._completed
 
+    @property
+    def deferred(self):
+        return self._deferred
+
     @property
     def executor(self):
         return self._executor
@@ -415,21 +1212,71 @@ class AsyncRequest:
     def timeout(self):
         return self._timeout
 
+    def add_done_callback(self, fn):
+        ''' calls fn(request) once the request is completed, immediately if
+        it already is
+        '''
+        with self._lock:
+            if not self._completed.is_set():
+                self._continuations.append(fn)
+                return
+        fn(self)
+
     def cancel(self, error=SystemExit):
+        if self._future is None:
+            self._app.request_rejected(self, Task.CANCELLED)
+            return
+        if self.future.done() or self._cfuture.done():
+            return
+        if self._app.flight_recorder:
+            self._app.flight_recorder.cancel(self.task)
         self.future.cancel()
         self.task.finalize(self.future)
-        Pykron.stop_thread(self.task.thread_id, error)
+        # a request still queued in the executor has no thread to stop
+        if not self._cfuture.cancel():
+            self._app.interrupt(self.task, error)
+
+    def run(self):
+        _current_request.set(self)
+        return self.task.run()
 
     def on_completed(self, future):
-        self._app.future_completed(self)
+        self._loop.call_soon_threadsafe(self._app.future_completed, self)
 
     def set_completed(self):
-        self._completed.set()
+        with self._lock:
+            self._completed.set()
+            continuations = self._continuations
+            self._continuations = []
+        for fn in continuations:
+            fn(self)
+
+    def __iter__(self):
+        ''' iterates over the items produced by a generator target while it
+        is running
+        '''
+        if self.task.stream is None:
+            raise TypeError("%s is not a generator task" % self.task.func_name)
+        return iter(self.task.stream)
+
+    def then(self, target, timeout=Pykron.TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0):
+        ''' returns a request running target(retval) once this request
+        succeeded
+        '''
+        return self._app.continueWith([self], target, True, timeout, callback, cancel_propagation, priority)
 
     def stop_timeout_handler(self):
-        self._timeout_thread.cancel()
+        timer = self._timeout_thread
+        if timer is not None:
+            timer.cancel()
+            self._timeout_thread = None
 
     def timeout_cb(self):
+        if self._future is None:
+            # a continuation not dispatched yet
+            if not self.completed.is_set():
+                self._app.request_rejected(self, Task.TIMEOUT)
+            return
         if not self.future.done():
             self.task.set_timeout()
             self.cancel(TimeoutError)
@@ -438,7 +1285,7 @@ class AsyncRequest:
     def wait_for_completed(self, timeout=Pykron.TIMEOUT_DEFAULT):
         if timeout is None:
             timeout = self._timeout
-        res = self.completed.wait(timeout=timeout)
+        res = self._app.wait(self, timeout)
         if res is True:
             return self._retval
         else:
@@ -447,3 +1294,370 @@ class AsyncRequest:
             self.cancel(TimeoutError)
             self.completed.wait()
             return None
+
+class TaskScope:
+    ''' Structured concurrency scope, see Pykron.scope()
+
+    The requests created while the scope is entered are indexed by task id,
+    including the ones created by their tasks since these run in a copy of
+    the context of the scope, and those of nested scopes. When one of them
+    does not succeed, or the deadline of the scope expires, all the requests
+    still running are cancelled in one go and new ones are rejected as
+    Task.CANCELLED. Leaving the scope waits until all of them are completed,
+    then raises the first failure (see raise_failure()) unless the block
+    raised itself. The expiry of the deadline of the scope is not a failure,
+    it is reported by timed_out.
+    '''
+
+    def __init__(self, app, timeout=None):
+        self._app = app
+        self._parent = _current_scope.get()
+        self._deadline = app.createDeadline(_current_request.get(), timeout)
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._idle = threading.Event()
+        self._idle.set()
+        self._cancelled = False
+        self._timed_out = False
+        self._failure = None
+        self._token = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def deadline(self):
+        return self._deadline
+
+    @property
+    def failure(self):
+        ''' the first request of the scope that did not succeed, before the
+        scope was cancelled, None if there is none
+        '''
+        return self._failure
+
+    @property
+    def pending(self):
+        return len(self._requests)
+
+    @property
+    def timed_out(self):
+        return self._timed_out
+
+    def add(self, request):
+        with self._lock:
+            self._requests[request.task.task_id] = request
+            self._idle.clear()
+        if self._parent is not None:
+            self._parent.add(request)
+        request.add_done_callback(self.on_completed)
+
+    def cancel(self):
+        ''' cancels the requests of the scope that are still running, the most
+        recent (innermost) first. They end as Task.TIMEOUT once the deadline
+        of the scope is expired.
+        '''
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            requests = sorted(self._requests.items(), reverse=True)
+        expired = self._deadline is not None and self._app.clock.now() >= self._deadline
+        for task_id, req in requests:
+            # a request being dispatched checks the scope by itself
+            if req.completed.is_set() or (req.future is None and not req.deferred):
+                continue
+            if expired:
+                req.timeout_cb()
+            else:
+                req.cancel()
+
+    def join(self):
+        clock = self._app.clock
+        with self._app.blocking():
+            while not self._idle.is_set():
+                if self._deadline is None:
+                    self._idle.wait()
+                    break
+                remaining = self._deadline - clock.now()
+                if remaining <= 0 or not clock.wait(self._idle, remaining):
+                    self._timed_out = True
+                    self.cancel()
+                    self._idle.wait()
+
+    def on_completed(self, request):
+        task = request.task
+        if task.status != Task.SUCCEED:
+            # a request timing out with the scope does not fail it
+            expired = task.status == Task.TIMEOUT and self._deadline is not None and task.deadline is not None and task.deadline >= self._deadline
+            with self._lock:
+                if self._failure is None and not self._cancelled and not expired:
+                    self._failure = request
+            self.cancel()
+        with self._lock:
+            self._requests.pop(request.task.task_id, None)
+            if not self._requests:
+                self._idle.set()
+
+    def __enter__(self):
+        self._token = _current_scope.set(self)
+        return self
+
+    def raise_failure(self):
+        ''' raises the exception of the failed request, TimeoutError if it
+        timed out and RuntimeError if it was cancelled or rejected
+        '''
+        req = self._failure
+        if req is None:
+            return
+        task = req.task
+        if task.status == Task.FAILED:
+            error = req.future.exception()
+            if error is not None:
+                raise error
+        if task.status == Task.TIMEOUT:
+            raise TimeoutError("T%d (%s) timed out" % (task.task_id, task.func_name))
+        raise RuntimeError("T%d (%s) ended as %s" % (task.task_id, task.func_name, task.status))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_scope.reset(self._token)
+        if exc_type is not None:
+            self.cancel()
+        self.join()
+        if exc_type is None:
+            self.raise_failure()
+        return False
+
+class RequestGroup:
+
+    def __init__(self, requests):
+        self._requests = list(requests)
+
+    @property
+    def requests(self):
+        return self._requests
+
+    def map(self, target, timeout=Pykron.TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0):
+        ''' returns a group with a continuation target(retval) for each request
+        '''
+        return RequestGroup([req.then(target, timeout, callback, cancel_propagation, priority) for req in self._requests])
+
+    def then(self, target, timeout=Pykron.TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0):
+        ''' returns a request running target(retvals) once all the requests
+        of the group succeeded
+        '''
+        return Pykron.getInstance().continueWith(self._requests, target, False, timeout, callback, cancel_propagation, priority)
+
+    def wait_for_completed(self):
+        return Pykron.join(self._requests)
+
+class MapRequest:
+    ''' Result of Pykron.map()
+
+    Each chunk of items is run by a single request, so a chunk costs one
+    task record, one registry entry and one timeout timer. At most inflight
+    chunks are running: the iterable is consumed, and the next chunk is
+    submitted, as the chunks complete. The items of a chunk that does not
+    complete (e.g. on timeout) get the status of the chunk. The value of an
+    item that did not succeed is None, its error is kept in failures.
+    '''
+
+    def __init__(self, app, func, iterable, chunksize, ordered, timeout, priority, inflight=None):
+        if chunksize < 1:
+            raise ValueError("chunksize must be positive")
+        if inflight is None:
+            inflight = 2 * (app.pool.max_workers if app.pool else min(32, available_cpus() + 4))
+        if inflight < 1:
+            raise ValueError("inflight must be positive")
+        self._app = app
+        self._ordered = ordered
+        self._chunksize = chunksize
+        self._timeout = timeout
+        self._priority = priority
+        self._inflight = inflight
+        self._iterator = iter(iterable)
+        self._statuses = []
+        self._failures = {}
+        self._chunks = []
+        self._done = queue.Queue()
+        self._lock = threading.Condition()
+        self._running = 0
+        self._submitting = False
+        self._exhausted = False
+        # the chunks submitted on completion of others run in the context of
+        # the caller, so that they keep its parent request and scope
+        self._context = contextvars.copy_context()
+        self._parent = _current_request.get()
+        caller_frame = sys._getframe(2)
+        self._caller = (caller_frame.f_code.co_name, location(caller_frame.f_code.co_filename, caller_frame.f_lineno))
+        del caller_frame
+
+        def runner(items):
+            task = Pykron.current_task()
+            values = []
+            failures = {}
+            for i, item in enumerate(items):
+                # the chunk was finalized as timed out or cancelled
+                if task.status != Task.RUNNING:
+                    break
+                try:
+                    values.append(func(item))
+                except Exception as e:
+                    # the error stopping the thread of a finalized chunk
+                    if task.status != Task.RUNNING:
+                        raise
+                    values.append(None)
+                    failures[i] = repr(e)
+            return values, failures
+        self._runner = functools.wraps(func)(runner)
+        self.submit()
+
+    @property
+    def chunks(self):
+        ''' requests of the chunks submitted so far
+        '''
+        with self._lock:
+            return [chunk[2] for chunk in self._chunks if chunk[2] is not None]
+
+    @property
+    def failures(self):
+        ''' errors of the completed items that did not succeed, by index
+        '''
+        return self._failures
+
+    @property
+    def statuses(self):
+        ''' status of each item read so far, Task.IDLE until its chunk
+        completes
+        '''
+        return self._statuses
+
+    def submit(self):
+        ''' submits chunks until inflight are running or the iterable is
+        exhausted
+        '''
+        with self._lock:
+            if self._submitting:
+                return
+            self._submitting = True
+        app = self._app
+        parent = self._parent
+        while True:
+            with self._lock:
+                items = []
+                if not self._exhausted and self._running < self._inflight:
+                    items = list(itertools.islice(self._iterator, self._chunksize))
+                    if not items:
+                        self._exhausted = True
+                        if self._running == 0:
+                            self._done.put(None)
+                        self._lock.notify_all()
+                if not items:
+                    self._submitting = False
+                    return
+                index = len(self._chunks)
+                start = len(self._statuses)
+                self._statuses.extend([Task.IDLE] * len(items))
+                self._chunks.append([start, len(items), None, threading.Event()])
+                self._running += 1
+            task = Task(task_id=app.createTaskId(),
+                    target=self._runner,
+                    args=(items,),
+                    kwargs={},
+                    parent_id=parent.task.task_id if parent else None,
+                    deadline=app.createDeadline(parent, self._timeout),
+                    priority=self._priority,
+                    caller_depth=1)
+            task.set_caller(*self._caller)
+            req = app.createRequest(task, self._timeout, None, True)
+            with self._lock:
+                if self._chunks[index][2] is None:
+                    self._chunks[index][2] = req
+                self._lock.notify_all()
+            req.add_done_callback(functools.partial(self.on_chunk_completed, index))
+
+    def on_chunk_completed(self, index, req):
+        with self._lock:
+            self._chunks[index][2] = req
+            start, n, req, recorded = self._chunks[index]
+        task = req.task
+        if task.status == Task.SUCCEED:
+            self._statuses[start:start+n] = [Task.SUCCEED] * n
+            for i, error in task.retval[1].items():
+                self._statuses[start+i] = Task.FAILED
+                self._failures[start+i] = error
+        else:
+            self._statuses[start:start+n] = [task.status] * n
+            for i in range(start, start+n):
+                self._failures[i] = task.exception or task.status
+        recorded.set()
+        self._done.put(index)
+        with self._lock:
+            self._running -= 1
+            if self._exhausted:
+                if self._running == 0:
+                    self._done.put(None)
+                return
+            if self._submitting:
+                return
+        self._context.run(self.submit)
+
+    def chunk(self, index):
+        ''' waits until the chunk is submitted, returns None past the last one
+        '''
+        with self._lock:
+            while index >= len(self._chunks) or self._chunks[index][2] is None:
+                if index >= len(self._chunks) and self._exhausted:
+                    return None
+                self._lock.wait()
+            return self._chunks[index]
+
+    def indexes(self):
+        if self._ordered:
+            return itertools.takewhile(lambda index: self.chunk(index) is not None, itertools.count())
+        return iter(self._done.get, None)
+
+    def __iter__(self):
+        for index in self.indexes():
+            start, n, req, recorded = self.chunk(index)
+            self._app.wait(req)
+            recorded.wait()
+            if req.task.status == Task.SUCCEED:
+                yield from req.task.retval[0]
+            else:
+                yield from [None] * n
+
+    def wait_for_completed(self):
+        return list(self)
+
+class PeriodicRequest(AsyncRequest):
+
+    def __init__(self, app, task, timeout, periodic, callback=None, cancel_propagation=False):
+        self._periodic = periodic
+        super().__init__(app, task, timeout, callback, cancel_propagation)
+
+    @property
+    def period(self):
+        return self._periodic.period
+
+    @property
+    def stats(self):
+        return self._periodic.stats
+
+    def stop(self):
+        ''' stops the loop after the current iteration, the request completes
+        with Task.SUCCEED and the stats as return value
+        '''
+        self._periodic.stop()
+
+def _before_fork():
+    if Pykron._instance is not None:
+        Pykron._instance.logger.flush()
+
+def _after_fork_in_child():
+    if Pykron._instance is not None:
+        Pykron._instance.reinitialize()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_before_fork, after_in_child=_after_fork_in_child)
@@ -0,0 +1,76 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+from pykron.core import Pykron
+
+class PykronDAG:
+    ''' Small DAG of requests
+
+    Each node is a target that gets the return values of its dependencies as
+    positional arguments. Nodes are scheduled as continuations, so a node is
+    dispatched as soon as its inputs complete without any thread waiting for
+    them. Dependencies must be added before the nodes using them, which keeps
+    the graph acyclic by construction.
+    '''
+
+    def __init__(self):
+        self._nodes = {}
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def add(self, name, target, deps=(), timeout=Pykron.TIMEOUT_DEFAULT, callback=None, cancel_propagation=True, priority=0):
+        if name in self._nodes:
+            raise ValueError("node %s already exists" % name)
+        for dep in deps:
+            if dep not in self._nodes:
+                raise ValueError("unknown dependency %s of node %s" % (dep, name))
+        self._nodes[name] = (target, tuple(deps), timeout, callback, cancel_propagation, priority)
+        return self
+
+    def node(self, name, deps=(), **kwargs):
+        ''' decorator version of add()
+        '''
+        def wrapper(target):
+            self.add(name, target, deps, **kwargs)
+            return target
+        return wrapper
+
+    def run(self):
+        ''' dispatches the graph and returns the requests indexed by node name
+        '''
+        app = Pykron.getInstance()
+        requests = {}
+        for name, (target, deps, timeout, callback, cancel_propagation, priority) in self._nodes.items():
+            inputs = [requests[dep] for dep in deps]
+            requests[name] = app.continueWith(inputs, target, True, timeout, callback, cancel_propagation, priority)
+        return requests
@@ -0,0 +1,218 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'PKJ1'
+VERSION = 2
+HEADER = struct.Struct('<4sHH8x')
+
+# wall ts, task id, parent id, function, location, caller function, caller
+# location, status, arrival ts, start ts, end ts, duration, idle time, cpu
+# time, wait time, voluntary and involuntary context switches.
+# Times are integer nanoseconds, -1 when unknown.
+RECORD = struct.Struct('<qqqIIIIB7xqqqqqqqqq')
+FIELDS = ('timestamp', 'task_id', 'parent_id', 'func_name', 'func_loc', 'caller_name', 'caller_loc', 'status', 'arrival_ts', 'start_ts', 'end_ts', 'duration', 'idle_time',
+          'cpu_time', 'wait_time', 'voluntary_switches', 'involuntary_switches')
+STRING_FIELDS = ('func_name', 'func_loc', 'caller_name', 'caller_loc')
+TIME_FIELDS = ('arrival_ts', 'start_ts', 'end_ts', 'duration', 'idle_time', 'cpu_time', 'wait_time')
+COUNT_FIELDS = ('voluntary_switches', 'involuntary_switches')
+
+STATUSES = ('IDLE', 'RUNNING', 'SUCCEED', 'FAILED', 'CANCELLED', 'TIMEOUT', 'REJECTED')
+
+def numpy_dtype():
+    import numpy
+    return numpy.dtype({
+        'names': list(FIELDS),
+        'formats': ['<i8', '<i8', '<i8', '<u4', '<u4', '<u4', '<u4', 'u1'] + ['<i8'] * 9,
+        'offsets': [0, 8, 16, 24, 28, 32, 36, 40, 48, 56, 64, 72, 80, 88, 96, 104, 112],
+        'itemsize': RECORD.size})
+
+def _ns(ts):
+    if ts is None:
+        return -1
+    return int(ts * 1e9)
+
+def _count(n):
+    return -1 if n is None else n
+
+class PykronJournal:
+    ''' Append-only binary journal of task executions
+
+    Each execution is a fixed-size RECORD. Function names and locations are
+    interned: the record stores an id and the string is appended once to the
+    side table <path>.strings, one JSON string per line.
+    An existing journal with another header (e.g. an older version) is moved
+    to <path>.<n> with its strings, and a truncated record at its end is
+    dropped before appending.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._ids = {}
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size > 0 and not PykronJournal.compatible(path):
+            PykronJournal.rotate(path)
+            size = 0
+        if size > 0:
+            for s in JournalReader.read_strings(path):
+                self._ids[s] = len(self._ids)
+        self._records = open(path, 'ab')
+        self._strings = open(path + '.strings', 'a' if size > 0 else 'w')
+        if size == 0:
+            self._records.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        elif (size - HEADER.size) % RECORD.size:
+            self._records.truncate(size - (size - HEADER.size) % RECORD.size)
+
+    @property
+    def path(self):
+        return self._path
+
+    def intern(self, s):
+        string_id = self._ids.get(s)
+        if string_id is None:
+            string_id = len(self._ids)
+            self._ids[s] = string_id
+            self._strings.write(json.dumps(s) + '\n')
+            # records must never reference a string missing from the file
+            self._strings.flush()
+        return string_id
+
+    def append(self, task):
+        parent_id = task.parent_id if task.parent_id is not None else -1
+        with self._lock:
+            self._records.write(RECORD.pack(
+                time.time_ns(), task.task_id, parent_id,
+                self.intern(task.func_name), self.intern(task.func_loc),
+                self.intern(task.caller_name), self.intern(task.caller_loc),
+                STATUSES.index(task.status),
+                _ns(task.arrival_ts), _ns(task.start_ts), _ns(task.end_ts), _ns(task.duration), _ns(task.idle_time),
+                _ns(task.cpu_time), _ns(task.wait_time), _count(task.voluntary_switches), _count(task.involuntary_switches)))
+
+    def flush(self):
+        with self._lock:
+            self._strings.flush()
+            self._records.flush()
+
+    def close(self):
+        with self._lock:
+            self._strings.close()
+            self._records.close()
+
+    @staticmethod
+    def compatible(path):
+        ''' True if the file starts with the header of this journal version
+        '''
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        return len(header) == HEADER.size and HEADER.unpack(header) == (MAGIC, VERSION, RECORD.size)
+
+    @staticmethod
+    def rotate(path):
+        ''' moves the journal and its strings to the first free <path>.<n>
+        '''
+        n = 1
+        while os.path.exists("%s.%d" % (path, n)):
+            n += 1
+        os.replace(path, "%s.%d" % (path, n))
+        if os.path.exists(path + '.strings'):
+            os.replace(path + '.strings', "%s.%d.strings" % (path, n))
+
+class JournalReader:
+    ''' Memory-mapped reader of a PykronJournal
+
+    to_numpy() returns a structured array that is a zero-copy view of the
+    file, so millions of records load in milliseconds. A truncated record at
+    the end of the file (e.g. after a crash) is ignored.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._strings = JournalReader.read_strings(path)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > HEADER.size:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._mm = b''
+        if len(self._mm) > 0:
+            magic, version, record_size = HEADER.unpack_from(self._mm)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError("%s is not a pykron journal (version %d)" % (path, VERSION))
+        self._count = max(0, (len(self._mm) - HEADER.size) // RECORD.size)
+
+    @property
+    def strings(self):
+        return self._strings
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        ''' yields the records as dicts with strings and times in seconds '''
+        end = HEADER.size + self._count * RECORD.size
+        for values in RECORD.iter_unpack(self._mm[HEADER.size:end]):
+            record = dict(zip(FIELDS, values))
+            for field in STRING_FIELDS:
+                record[field] = self._strings[record[field]]
+            for field in TIME_FIELDS:
+                record[field] = None if record[field] < 0 else record[field] / 1e9
+            for field in COUNT_FIELDS:
+                if record[field] < 0:
+                    record[field] = None
+            record['timestamp'] = record['timestamp'] / 1e9
+            record['status'] = STATUSES[record['status']]
+            if record['parent_id'] < 0:
+                record['parent_id'] = None
+            yield record
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def to_numpy(self):
+        import numpy
+        if self._count == 0:
+            return numpy.zeros(0, dtype=numpy_dtype())
+        return numpy.frombuffer(self._mm, dtype=numpy_dtype(), count=self._count, offset=HEADER.size)
+
+    @staticmethod
+    def read_strings(path):
+        try:
+            with open(path + '.strings') as f:
+                return [json.loads(line) for line in f if line.endswith('\n')]
+        except FileNotFoundError:
+            return []
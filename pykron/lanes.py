@@ -0,0 +1,189 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+from concurrent.futures import Executor, Future
+import collections
+import threading
+
+from pykron.pool import WorkItem
+
+# key of the lane owning the current thread
+_lane = threading.local()
+
+def current_lane():
+    ''' key of the lane running the calling thread, None outside of a lane
+    '''
+    return getattr(_lane, 'key', None)
+
+def _set_lane(key):
+    _lane.key = key
+
+class _Lane(Executor):
+    ''' Single thread executor of a lane
+
+    Like the PykronPool workers, the lane thread survives the asynchronous
+    exceptions raised by Pykron.stop_thread when they land after the target
+    returned, otherwise every later request with the key would hang. After
+    keepalive idle seconds the lane retires: its thread exits and it is
+    dropped from its PykronLanes, a later submit goes to a new lane.
+    '''
+
+    def __init__(self, lanes, key, keepalive):
+        self._lanes = lanes
+        self._key = key
+        self._keepalive = keepalive
+        self._work = threading.Condition()
+        self._queue = collections.deque()
+        self._shutdown = False
+        self._retired = False
+        self._thread = None
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._work:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            if not self._retired:
+                future = Future()
+                self._queue.append(WorkItem(future, fn, args, kwargs))
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._worker, name="PykronLane[%r]" % (self._key,), daemon=True)
+                    self._thread.start()
+                self._work.notify()
+                return future
+        # the lane retired after it was looked up, its queue is empty so the
+        # order of the key is kept
+        return self._lanes.executor(self._key).submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._work:
+            self._shutdown = True
+            if cancel_futures:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+            self._work.notify()
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _next_item(self):
+        while True:
+            with self._work:
+                while not self._queue:
+                    if self._shutdown:
+                        return None
+                    if not self._work.wait(self._keepalive):
+                        break
+                else:
+                    return self._queue.popleft()
+            if self._lanes.retire(self):
+                return None
+
+    def _retire(self):
+        ''' called by PykronLanes.retire with its lock held '''
+        with self._work:
+            if self._queue:
+                return False
+            self._retired = True
+            self._thread = None
+            return True
+
+    def _worker(self):
+        _set_lane(self._key)
+        while True:
+            try:
+                item = self._next_item()
+                if item is None:
+                    return
+                item.run()
+            except BaseException:
+                # a late asynchronous exception must not kill the lane
+                continue
+            finally:
+                item = None
+
+class PykronLanes:
+    ''' Serial executors for keyed requests
+
+    Every key gets its own lane, a single thread executor: the requests with
+    the same key run one at a time in submission order, on the thread of the
+    lane, while different keys run in parallel. A lane idle for keepalive
+    seconds retires, so keys may name an unbounded set of resources (e.g.
+    connections) without keeping a thread per key.
+    '''
+
+    KEEPALIVE_DEFAULT = 5.0
+
+    def __init__(self, keepalive=KEEPALIVE_DEFAULT):
+        self._keepalive = keepalive
+        self._lock = threading.Lock()
+        self._lanes = {}
+
+    @property
+    def keepalive(self):
+        return self._keepalive
+
+    @property
+    def keys(self):
+        with self._lock:
+            return list(self._lanes)
+
+    def executor(self, key):
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = _Lane(self, key, self._keepalive)
+                self._lanes[key] = lane
+            return lane
+
+    def retire(self, lane):
+        ''' drops an idle lane, returns False if work was queued meanwhile
+        '''
+        with self._lock:
+            if not lane._retire():
+                return False
+            if self._lanes.get(lane._key) is lane:
+                del self._lanes[lane._key]
+            return True
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            lanes = list(self._lanes.values())
+            self._lanes = {}
+        for lane in lanes:
+            lane.shutdown(wait=wait, cancel_futures=True)
+
+    def reinitialize(self):
+        ''' drops the lanes in a forked child, where their threads do not
+        exist
+        '''
+        self._lock = threading.Lock()
+        self._lanes = {}
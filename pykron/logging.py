@@ -31,67 +31,463 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import threading
 import os
-import csv
 import datetime
 import logging
+import logging.handlers
+import queue
+import reprlib
 import time
 import __main__
 
+from pykron.periodic import Histogram
+
+class PykronRepr(reprlib.Repr):
+    ''' Bounded repr for the values stored in the execution records
+
+    Containers are truncated by reprlib, array-like objects (anything with a
+    shape and a dtype) are summarised by shape and dtype, and large binary
+    buffers by their length. The result never exceeds maxlength characters.
+    '''
+
+    MAXLEN_DEFAULT = 256
+    MAXLEVEL_DEFAULT = 3
+    # immutable values that snapshot() keeps as they are
+    ATOMIC = (type(None), bool, int, float, complex)
+
+    def __init__(self, maxlength=MAXLEN_DEFAULT, maxlevel=MAXLEVEL_DEFAULT):
+        super().__init__()
+        self.maxlength = maxlength
+        self.maxlevel = maxlevel
+        self.maxstring = maxlength
+        self.maxother = maxlength
+
+    def repr(self, x):
+        if isinstance(x, str):
+            res = x
+        else:
+            res = super().repr(x)
+        return self.truncate(res)
+
+    def snapshot(self, x):
+        ''' cheap bounded copy of x, taken when a task completes with
+        lazy_repr: immutable scalars, short strings and short tuples of them
+        are kept and formatted later, anything else is formatted right away so
+        that the record neither keeps the payload alive nor sees its later
+        mutations
+        '''
+        if self.deferrable(x):
+            return x
+        if isinstance(x, tuple) and len(x) <= self.maxtuple and all(self.deferrable(item) for item in x):
+            return x
+        return self.repr(x)
+
+    def deferrable(self, x):
+        return isinstance(x, PykronRepr.ATOMIC) or (isinstance(x, (str, bytes)) and len(x) <= self.maxstring)
+
+    def repr1(self, x, level):
+        summary = self.summarise(x)
+        if summary is not None:
+            return summary
+        return super().repr1(x, level)
+
+    def summarise(self, x):
+        shape = getattr(x, 'shape', None)
+        dtype = getattr(x, 'dtype', None)
+        if shape is not None and dtype is not None and not isinstance(x, type):
+            return "<%s shape=%s dtype=%s>" % (type(x).__name__, tuple(shape), dtype)
+        if isinstance(x, (bytes, bytearray, memoryview)) and len(x) > self.maxstring:
+            return "<%s len=%d>" % (type(x).__name__, len(x))
+        return None
+
+    def truncate(self, s):
+        if len(s) > self.maxlength:
+            i = max(0, (self.maxlength - 3) // 2)
+            j = max(0, self.maxlength - 3 - i)
+            return s[:i] + '...' + s[len(s)-j:]
+        return s
+
+class DeferredFlushMixin:
+    ''' lets PykronLogListener flush a handler once per batch of records
+    instead of once per record
+    '''
+
+    deferred = False
+
+    def flush(self):
+        if not self.deferred:
+            super().flush()
+
+class PykronStreamHandler(DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+class PykronRotatingFileHandler(DeferredFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+class PykronTimedRotatingFileHandler(DeferredFlushMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+class PykronQueueHandler(logging.handlers.QueueHandler):
+    ''' QueueHandler that never blocks: records are dropped and counted when
+    the queue is full
+    '''
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+
+    def prepare(self, record):
+        # the listener runs in this process, formatting is left to its thread
+        return record
+
+class PykronLogListener:
+    ''' Drains the log queue on a dedicated thread
+
+    Records are handled in batches of up to BATCH_SIZE and the handlers are
+    flushed once per batch. The number of records dropped by the queue handler
+    is reported as a warning.
+    '''
+
+    BATCH_SIZE = 256
+
+    def __init__(self, log_queue, queue_handler):
+        self._queue = log_queue
+        self._queue_handler = queue_handler
+        self._handlers = []
+        self._reported = 0
+        self._sentinel = object()
+        self._thread = None
+
+    @property
+    def handlers(self):
+        return self._handlers
+
+    def addHandler(self, handler):
+        handler.deferred = True
+        self._handlers.append(handler)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, name="PykronLogListener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+        for handler in self._handlers:
+            handler.deferred = False
+            handler.flush()
+            handler.close()
+
+    def reinitialize(self, log_queue):
+        self._queue = log_queue
+        self._thread = None
+        self._reported = self._queue_handler.dropped
+        self.start()
+
+    def handle(self, record):
+        for handler in self._handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _monitor(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < PykronLogListener.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+            dropped = self._queue_handler.dropped
+            if dropped > self._reported:
+                self.handle(logging.makeLogRecord({'name': 'pykron', 'levelno': logging.WARNING, 'levelname': 'WARNING', 'msg': "%d log records dropped" % (dropped - self._reported)}))
+                self._reported = dropped
+            for handler in self._handlers:
+                handler.acquire()
+                try:
+                    if handler.stream:
+                        handler.stream.flush()
+                finally:
+                    handler.release()
+            if stop:
+                return
+
+class PykronLogSampler:
+    ''' Per-function sampling of the task lifecycle messages
+
+    Within each interval the first `first` executions of a function are
+    logged, after that one execution every `every` (0 disables it). Whether a
+    task is sampled is decided once when it starts, so its STARTED and
+    COMPLETED messages are either both logged or both skipped. Errors are
+    never sampled out.
+
+    With summary=True the executions of each function are aggregated and a
+    summary is logged at INFO level once per interval.
+    '''
+
+    def __init__(self, every=0, first=10, interval=1.0, summary=True):
+        self._every = every
+        self._first = first
+        self._interval = interval
+        self._summary = summary
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    @property
+    def every(self):
+        return self._every
+
+    @property
+    def first(self):
+        return self._first
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def summary(self):
+        return self._summary
+
+    def window(self, task, now):
+        w = self._windows.get(task.func_loc)
+        if w is None:
+            w = self._windows[task.func_loc] = PykronLogWindow(task.func_name, now)
+        return w
+
+    def sample(self, task):
+        now = time.perf_counter()
+        with self._lock:
+            w = self.window(task, now)
+            if now - w.start >= self._interval and not self._summary:
+                w.reset(now)
+            w.started += 1
+            if w.started <= self._first or (self._every and w.started % self._every == 0):
+                return True
+            w.suppressed += 1
+            return False
+
+    def record(self, task, log):
+        ''' aggregates a completed task and logs the summary of its function
+        when the interval is elapsed
+        '''
+        if not self._summary:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            w = self.window(task, now)
+            w.record(task)
+            if now - w.start < self._interval:
+                return
+            summary = w.summary(now)
+            w.reset(now)
+        log.info("%s", summary)
+
+    def flush(self, log):
+        ''' logs the summaries of the pending intervals
+        '''
+        if not self._summary:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            summaries = [w.summary(now) for w in self._windows.values() if w.runs]
+            self._windows.clear()
+        for summary in summaries:
+            log.info("%s", summary)
+
+class PykronLogWindow:
+    ''' executions of one function within the current sampling interval
+    '''
+
+    def __init__(self, func_name, now):
+        self.func_name = func_name
+        self.reset(now)
+
+    def reset(self, now):
+        self.start = now
+        self.started = 0
+        self.suppressed = 0
+        self.runs = 0
+        self.failures = 0
+        self.durations = Histogram()
+
+    def record(self, task):
+        self.runs += 1
+        if task.status != task.SUCCEED:
+            self.failures += 1
+        self.durations.record(task.duration)
+
+    def summary(self, now):
+        return "%s: %d runs, p50 %.6fs, p99 %.6fs, max %.6fs, %d failures, %d suppressed in last %.1fs" % (
+            self.func_name, self.runs, self.durations.percentile(50), self.durations.percentile(99),
+            self.durations.max, self.failures, self.suppressed, now - self.start)
+
 class PykronLogger:
 
-    def __init__(self, logging_level, logging_format, logging_file=False, logging_path='.', save_csv=False):
+    QUEUE_SIZE_DEFAULT = 10000
+
+    def __init__(self, logging_level, logging_format, logging_file=False, logging_path='.', save_csv=False, repr_maxlen=PykronRepr.MAXLEN_DEFAULT, repr_maxlevel=PykronRepr.MAXLEVEL_DEFAULT, lazy_repr=False,
+                 queue_size=QUEUE_SIZE_DEFAULT, max_bytes=0, backup_count=5, rotate_when=None, save_journal=False, sampler=None):
         self._logging_level = logging_level
         self._logging_path = logging_path
         self._logging_format = logging_format
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._rotate_when = rotate_when
         self._logger = logging.getLogger('pykron')
         self._logger.setLevel(logging_level)
 
+        self._queue_handler = PykronQueueHandler(queue.Queue(queue_size))
+        self._queue_handler.setLevel(logging_level)
+        self._listener = PykronLogListener(self._queue_handler.queue, self._queue_handler)
+        self._logger.addHandler(self._queue_handler)
+
         self._executions = []
         self._save_csv = save_csv
+        self._repr = PykronRepr(repr_maxlen, repr_maxlevel)
+        self._lazy_repr = lazy_repr
+        self._sampler = sampler
+        self._journal = None
+        if save_journal:
+            from pykron.journal import PykronJournal
+            self._journal = PykronJournal(os.path.join(logging_path, self.filename('pkj')))
 
         if logging_file is False:
             self.addStreamHandler()
         else:
             self.addFileHandler(logging_path)
+        self._listener.start()
 
     def addFileHandler(self, path):
-        datetimestr = datetime.datetime.now().strftime('%d.%m.%Y_%H:%M')
-        main_name = os.path.split(__main__.__file__)[1].split('.')[0]
-        filename = "%s_%s.log" % (main_name, datetimestr)
-        filepath = os.path.join(path, filename)
-        ch = logging.FileHandler(filepath, mode='w')
+        filepath = os.path.join(path, self.filename('log'))
+        if self._rotate_when is not None:
+            ch = PykronTimedRotatingFileHandler(filepath, when=self._rotate_when, backupCount=self._backup_count)
+        else:
+            ch = PykronRotatingFileHandler(filepath, mode='w', maxBytes=self._max_bytes, backupCount=self._backup_count)
         ch.setLevel(self._logging_level)
         formatter = logging.Formatter(self._logging_format)
         ch.setFormatter(formatter)
-        self._logger.addHandler(ch)
+        self._listener.addHandler(ch)
 
     def addStreamHandler(self, stream=None):
-        ch = logging.StreamHandler(stream) # None defaults to sys.stderr
+        ch = PykronStreamHandler(stream) # None defaults to sys.stderr
         ch.setLevel(self._logging_level)
         formatter = logging.Formatter(self._logging_format)
         ch.setFormatter(formatter)
-        self._logger.addHandler(ch)
+        self._listener.addHandler(ch)
+
+    def close(self):
+        ''' flushes the pending records and detaches the logger
+        '''
+        if self._sampler and self._logger.isEnabledFor(logging.INFO):
+            self._sampler.flush(self._logger)
+        self._logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        if self._journal:
+            self._journal.close()
+
+    def flush(self):
+        if self._journal:
+            self._journal.flush()
+
+    def reinitialize(self):
+        ''' restarts the listener in a forked child. The pending records and
+        the executions belong to the parent, the journal is not shared.
+        '''
+        self._queue_handler.queue = queue.Queue(self._queue_handler.queue.maxsize)
+        self._listener.reinitialize(self._queue_handler.queue)
+        self._executions = []
+        self._journal = None
+
+    def filename(self, extension):
+        datetimestr = datetime.datetime.now().strftime('%d.%m.%Y_%H:%M')
+        main_name = os.path.split(__main__.__file__)[1].split('.')[0]
+        return "%s_%s.%s" % (main_name, datetimestr, extension)
+
+    @property
+    def dropped(self):
+        return self._queue_handler.dropped
+
+    @property
+    def journal(self):
+       return self._journal
+
+    @property
+    def lazy_repr(self):
+       return self._lazy_repr
 
     @property
     def logging_level(self):
        return self._logging_level
 
+    @property
+    def sampler(self):
+       return self._sampler
+
+    @property
+    def repr(self):
+       return self._repr
+
     @property
     def log(self):
        return self._logger
 
+    def sample(self, task):
+        ''' tells whether the lifecycle messages of the task have to be logged
+        '''
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return False
+        if self._sampler is None:
+            return True
+        return self._sampler.sample(task)
+
     def log_execution(self, task):
+        if self._sampler and self._logger.isEnabledFor(logging.INFO):
+            self._sampler.record(task, self._logger)
+        if self._journal:
+            self._journal.append(task)
         if self._save_csv:
-            task_exec = [str(time.time()), task.func_name, task.func_loc, task.caller_name, task.caller_loc, task.status, task.arrival_ts, task.start_ts, task.end_ts, task.duration, task.idle_time, str(task.retval), str(task.exception), str(task.args)]
+            task_exec = [str(time.time()), task.func_name, task.func_loc, task.caller_name, task.caller_loc, task.status, task.arrival_ts, task.start_ts, task.end_ts, task.duration, task.idle_time, task.retval, task.exception, task.args, task.task_id, task.parent_id,
+                         task.cpu_time, task.wait_time, task.voluntary_switches, task.involuntary_switches]
+            if self._lazy_repr:
+                for i in range(11, 14):
+                    task_exec[i] = self._repr.snapshot(task_exec[i])
+            else:
+                self.format_execution(task_exec)
             self._executions.append(task_exec)
 
+    def format_execution(self, task_exec):
+        for i in range(11, 14):
+            task_exec[i] = self._repr.repr(task_exec[i])
+        return task_exec
+
     def save_csv(self):
         if self._save_csv:
-            datetimestr = datetime.datetime.now().strftime('%d.%m.%Y_%H:%M')
-            main_name = os.path.split(__main__.__file__)[1].split('.')[0]
-            filename = "%s_%s.csv" % (main_name, datetimestr)
-            headers = ["Timestamp", "Function", "Location", "Caller function", "Caller location", "Status", "Arrival Ts", "Start Ts", "End Ts", "Duration", "Idle time", "Return value", "Exception", "Args"]
+            filename = self.filename('csv')
+            headers = ["Timestamp", "Function", "Location", "Caller function", "Caller location", "Status", "Arrival Ts", "Start Ts", "End Ts", "Duration", "Idle time", "Return value", "Exception", "Args", "Task id", "Parent id",
+                       "CPU time", "Wait time", "Voluntary switches", "Involuntary switches"]
+            import csv
             with open(os.path.join(self._logging_path, filename), 'w') as f:
                 writer = csv.writer(f)
                 writer.writerow(headers)
-                writer.writerows(self._executions)
+                if self._lazy_repr:
+                    writer.writerows(self.format_execution(task_exec) for task_exec in self._executions)
+                else:
+                    writer.writerows(self._executions)
@@ -0,0 +1,216 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import functools
+import math
+import threading
+
+from pykron.clock import Clock
+
+class Histogram:
+    ''' Log-linear histogram with a fixed number of buckets
+
+    Recording a value is O(1) and allocation free, percentiles are
+    approximated by the upper bound of the matching bucket.
+    '''
+
+    def __init__(self, lowest=1e-6, highest=10.0, buckets_per_decade=20):
+        self._lowest = lowest
+        self._buckets_per_decade = buckets_per_decade
+        self._size = int(math.ceil(math.log10(highest / lowest) * buckets_per_decade)) + 1
+        self._counts = [0] * (self._size + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def max(self):
+        return self._max
+
+    @property
+    def mean(self):
+        if self._count == 0:
+            return None
+        return self._sum / self._count
+
+    @property
+    def min(self):
+        return self._min
+
+    def record(self, value):
+        if value <= self._lowest:
+            index = 0
+        else:
+            index = min(self._size, int(math.log10(value / self._lowest) * self._buckets_per_decade) + 1)
+        self._counts[index] += 1
+        self._count += 1
+        self._sum += value
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def bucket_bound(self, index):
+        return self._lowest * 10 ** (index / self._buckets_per_decade)
+
+    def percentile(self, p):
+        if self._count == 0:
+            return None
+        rank = max(1, int(math.ceil(self._count * p / 100.0)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_bound(index), self._max)
+        return self._max
+
+    def __str__(self):
+        if self._count == 0:
+            return "n=0"
+        return "n=%d min=%.6f p50=%.6f p99=%.6f max=%.6f" % (self._count, self._min, self.percentile(50), self.percentile(99), self._max)
+
+class PeriodicStats:
+
+    def __init__(self):
+        self._iterations = 0
+        self._overruns = 0
+        self._skipped = 0
+        self._jitter = Histogram()
+        self._response = Histogram()
+
+    @property
+    def iterations(self):
+        return self._iterations
+
+    @property
+    def jitter(self):
+        ''' histogram of the release jitter, i.e. the delay between the
+        scheduled release and the actual start of an iteration
+        '''
+        return self._jitter
+
+    @property
+    def overruns(self):
+        return self._overruns
+
+    @property
+    def response(self):
+        ''' histogram of the response time, i.e. the time between the
+        scheduled release and the end of an iteration
+        '''
+        return self._response
+
+    @property
+    def skipped(self):
+        return self._skipped
+
+    def __str__(self):
+        return "iterations=%d overruns=%d skipped=%d jitter(%s) response(%s)" % (self._iterations, self._overruns, self._skipped, self._jitter, self._response)
+
+class PeriodicLoop:
+    ''' Runs a target at a fixed period against absolute deadlines
+
+    Releases are computed as start + k*period, so the error of a single
+    iteration does not accumulate. When an iteration overruns the next
+    release, SKIP moves to the next release in the future while CATCH_UP
+    runs the missed iterations back to back.
+    '''
+
+    SKIP = 'skip'
+    CATCH_UP = 'catch_up'
+
+    def __init__(self, target, period, overrun=SKIP, iterations=None, clock=None):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        if overrun not in (PeriodicLoop.SKIP, PeriodicLoop.CATCH_UP):
+            raise ValueError("overrun must be '%s' or '%s'" % (PeriodicLoop.SKIP, PeriodicLoop.CATCH_UP))
+        self._target = target
+        self._period = period
+        self._overrun = overrun
+        self._iterations = iterations
+        self._clock = clock or Clock()
+        self._stats = PeriodicStats()
+        self._stopped = threading.Event()
+
+        def runner(*args, **kwargs):
+            return self.run(*args, **kwargs)
+        self._runner = functools.wraps(target)(runner)
+
+    @property
+    def overrun(self):
+        return self._overrun
+
+    @property
+    def period(self):
+        return self._period
+
+    @property
+    def runner(self):
+        return self._runner
+
+    @property
+    def stats(self):
+        return self._stats
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self, *args, **kwargs):
+        stats = self._stats
+        period = self._period
+        clock = self._clock
+        release = clock.now()
+        while not self._stopped.is_set():
+            if self._iterations is not None and stats._iterations >= self._iterations:
+                break
+            now = clock.now()
+            if now < release:
+                if clock.wait(self._stopped, release - now):
+                    break
+                now = clock.now()
+            stats._jitter.record(now - release)
+            self._target(*args, **kwargs)
+            end = clock.now()
+            stats._response.record(end - release)
+            stats._iterations += 1
+            release += period
+            if end > release:
+                stats._overruns += 1
+                if self._overrun == PeriodicLoop.SKIP:
+                    missed = int((end - release) // period) + 1
+                    stats._skipped += missed
+                    release += missed * period
+        return stats
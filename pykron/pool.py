@@ -0,0 +1,330 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+from concurrent.futures import Executor, Future
+import collections
+import contextlib
+import math
+import os
+import threading
+import time
+
+def available_cpus():
+    ''' number of CPUs usable by this process, taking into account the CPU
+    affinity set and the cgroup CPU quota
+    '''
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+def cgroup_cpu_quota():
+    ''' CPU quota (in CPUs) of the cgroup of this process, None if unlimited
+    '''
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota == 'max':
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota <= 0:
+            return None
+        return quota / period
+    except (OSError, ValueError):
+        return None
+
+class WorkItem:
+    ''' call of fn queued in a PykronPool or a lane, run() completes the
+    future with its result. enqueue_ts drives the scaling of the pool and is
+    always real time, arrival_ts is read from the clock of the runtime.
+    '''
+
+    def __init__(self, future, fn, args, kwargs, arrival_ts=None):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueue_ts = time.perf_counter()
+        self.arrival_ts = self.enqueue_ts if arrival_ts is None else arrival_ts
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+
+class PykronPool(Executor):
+    ''' Autoscaling thread pool
+
+    The pool keeps between min_workers and max_workers threads. It grows when
+    queued work has been waiting longer than grow_delay with no idle worker,
+    and a worker retires after being idle for keepalive seconds. Workers
+    blocked in a Pykron wait primitive do not count against max_workers.
+    '''
+
+    GROW_DELAY_DEFAULT = 0.005
+    KEEPALIVE_DEFAULT = 5.0
+    DELAY_SMOOTHING = 0.2
+
+    def __init__(self, min_workers=1, max_workers=None, grow_delay=GROW_DELAY_DEFAULT, keepalive=KEEPALIVE_DEFAULT, clock=None):
+        if max_workers is None:
+            max_workers = min(32, available_cpus() + 4)
+        if min_workers < 0 or max_workers < max(1, min_workers):
+            raise ValueError("invalid pool size [%d, %d]" % (min_workers, max_workers))
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        self._grow_delay = grow_delay
+        self._keepalive = keepalive
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._scale = threading.Condition(self._lock)
+        self._queue = collections.deque()
+        self._threads = set()
+        self._idle = 0
+        self._blocked = 0
+        self._queue_delay = 0.0
+        self._shutdown = False
+        self._monitor = None
+        self._thread_nr = 0
+
+    @property
+    def blocked(self):
+        return self._blocked
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def busy(self):
+        return len(self._threads) - self._idle - self._blocked
+
+    @property
+    def idle(self):
+        return self._idle
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    @property
+    def min_workers(self):
+        return self._min_workers
+
+    @property
+    def queue_delay(self):
+        return self._queue_delay
+
+    @property
+    def queue_age(self):
+        ''' time the oldest queued work item has been waiting on the clock of
+        the runtime, None if the queue is empty
+        '''
+        with self._lock:
+            if not self._queue:
+                return None
+            arrival_ts = self._queue[0].arrival_ts
+        return (self._clock.now() if self._clock else time.perf_counter()) - arrival_ts
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    @property
+    def utilisation(self):
+        workers = len(self._threads)
+        if workers == 0:
+            return 0.0
+        return self.busy / workers
+
+    @property
+    def workers(self):
+        return len(self._threads)
+
+    def attach(self, clock):
+        ''' called by the runtime: sets the clock, unless one was given '''
+        if self._clock is None:
+            self._clock = clock
+
+    def is_worker(self, thread=None):
+        if thread is None:
+            thread = threading.current_thread()
+        return thread in self._threads
+
+    @contextlib.contextmanager
+    def blocking(self):
+        ''' marks the calling worker as blocked while in the context, so that
+        the pool can compensate for it with an extra thread
+        '''
+        if not self.is_worker():
+            yield
+            return
+        with self._lock:
+            self._blocked += 1
+            if len(self._queue) > self._idle:
+                self._grow(len(self._queue) - self._idle)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._blocked -= 1
+
+    def reinitialize(self):
+        ''' resets the pool in a forked child, where the worker threads of the
+        parent do not exist. The queued work is dropped.
+        '''
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._scale = threading.Condition(self._lock)
+        self._queue = collections.deque()
+        self._threads = set()
+        self._idle = 0
+        self._blocked = 0
+        self._monitor = None
+
+    def run_inline(self, future):
+        ''' runs the work item of future in the calling thread if it is still
+        queued, returns whether it was run
+        '''
+        with self._lock:
+            for item in self._queue:
+                if item.future is future:
+                    self._queue.remove(item)
+                    break
+            else:
+                return False
+        item.run()
+        return True
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = Future()
+            self._queue.append(WorkItem(future, fn, args, kwargs, self._clock.now() if self._clock else None))
+            if len(self._queue) > self._idle:
+                if len(self._threads) < self._min_workers:
+                    self._grow(1)
+                else:
+                    self._start_monitor()
+                    self._scale.notify()
+            self._work.notify()
+            return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+            self._work.notify_all()
+            self._scale.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                if t is not threading.current_thread():
+                    t.join()
+
+    def _grow(self, n):
+        limit = self._max_workers + self._blocked
+        n = min(n, limit - len(self._threads))
+        for i in range(n):
+            self._thread_nr += 1
+            t = threading.Thread(target=self._worker, name="PykronPool_%d" % self._thread_nr, daemon=True)
+            self._threads.add(t)
+            t.start()
+
+    def _start_monitor(self):
+        if self._monitor is None:
+            self._monitor = threading.Thread(target=self._scaler, name="PykronPool_scaler", daemon=True)
+            self._monitor.start()
+
+    def _scaler(self):
+        with self._lock:
+            while not self._shutdown:
+                if len(self._queue) > self._idle:
+                    age = time.perf_counter() - self._queue[0].enqueue_ts
+                    if age >= self._grow_delay:
+                        self._grow(len(self._queue) - self._idle)
+                        self._scale.wait(self._grow_delay)
+                    else:
+                        self._scale.wait(self._grow_delay - age)
+                else:
+                    self._scale.wait()
+
+    def _next_item(self):
+        with self._lock:
+            self._idle += 1
+            try:
+                while not self._queue:
+                    if self._shutdown:
+                        self._threads.discard(threading.current_thread())
+                        return None
+                    if not self._work.wait(self._keepalive) and not self._queue and len(self._threads) > self._min_workers:
+                        self._threads.discard(threading.current_thread())
+                        return None
+                item = self._queue.popleft()
+            finally:
+                self._idle -= 1
+            delay = time.perf_counter() - item.enqueue_ts
+            self._queue_delay += PykronPool.DELAY_SMOOTHING * (delay - self._queue_delay)
+            return item
+
+    def _worker(self):
+        while True:
+            try:
+                item = self._next_item()
+                if item is None:
+                    return
+                item.run()
+            except BaseException:
+                # asynchronous exceptions raised by Pykron.stop_thread may land
+                # after the target returned: the worker must survive them
+                continue
+            finally:
+                # an idle worker must not keep the last work item alive
+                item = None
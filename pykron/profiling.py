@@ -29,9 +29,14 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import collections
+import dis
 import sys
 import os
 import datetime
+import inspect
+import threading
+import tracemalloc
 import __main__
 
 if sys.version_info > (3,7):
@@ -71,3 +76,130 @@ class PykronProfiler:
         main_name = os.path.split(__main__.__file__)[1].split('.')[0]
         filename = "%s_%s.stats" % (main_name, datetimestr)
         ps.dump_stats(filename)
+
+class PykronMemoryProfiler:
+    ''' Allocation profiler based on tracemalloc
+
+    Each task records the net bytes it allocated (allocated) and, when no
+    other task ran at the same time, the peak of its allocations
+    (peak_allocated). Both are measured on the memory traced by the whole
+    process, so with concurrent tasks allocated includes theirs.
+    The memory still allocated is attributed to the decorated functions from
+    the traceback of each allocation, which holds with concurrent tasks: the
+    innermost frame within a decorated function owns the allocation. Only
+    the nframe most recent frames of an allocation are kept.
+    Tracing starts with the first task, so that the imports of the runtime
+    are not traced.
+    '''
+
+    NFRAME_DEFAULT = 16
+    TOP_DEFAULT = 10
+
+    def __init__(self, nframe=NFRAME_DEFAULT):
+        self._nframe = nframe
+        self._lock = threading.Lock()
+        self._functions = {}
+        self._lines = collections.defaultdict(list)
+        self._owners = {}
+        self._tasks = {}
+        self._starts = {}
+        self._running = 0
+        self._started = 0
+        self._tracing = False
+
+    def addTask(self, task):
+        # map chunks and periodic loops run wrappers of the user function
+        code = getattr(inspect.unwrap(task.target), '__code__', None)
+        if code is None:
+            return
+        key = (code.co_filename, code.co_firstlineno)
+        with self._lock:
+            if key in self._functions:
+                return
+            self._functions[key] = task.func_name
+            lines = [line for _, line in dis.findlinestarts(code) if line is not None]
+            self._lines[code.co_filename].append((code.co_firstlineno, max(lines + [code.co_firstlineno]), task.func_name))
+            self._owners.clear()
+
+    def task_started(self, task):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self._nframe)
+                self._tracing = True
+            if self._running == 0 and hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self._running += 1
+            self._started += 1
+            self._starts[task.task_id] = (tracemalloc.get_traced_memory()[0], self._started)
+
+    def task_completed(self, task):
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            if task.task_id not in self._starts:
+                return
+            start, started = self._starts.pop(task.task_id)
+            alone = self._running == 1 and started == self._started and hasattr(tracemalloc, 'reset_peak')
+            self._running -= 1
+            allocated = current - start
+            peak_allocated = peak - start if alone else None
+            stats = self._tasks.setdefault(task.func_name, [0, 0, None])
+            stats[0] += 1
+            stats[1] += allocated
+            if peak_allocated is not None:
+                stats[2] = peak_allocated if stats[2] is None else max(stats[2], peak_allocated)
+        task.set_memory(allocated, peak_allocated)
+
+    def owner(self, filename, lineno):
+        ''' the decorated function whose code contains the line, or None '''
+        key = (filename, lineno)
+        if key not in self._owners:
+            self._owners[key] = None
+            for first, last, name in self._lines.get(filename, ()):
+                if first <= lineno <= last:
+                    self._owners[key] = name
+        return self._owners[key]
+
+    def statistics(self, limit=TOP_DEFAULT):
+        ''' returns (functions, sites). functions maps each decorated function
+        to its tasks, total net bytes, largest task peak, and the bytes and
+        blocks it still holds. sites are the limit allocation lines holding
+        the most memory within decorated functions, as (line, bytes, blocks).
+        '''
+        if not tracemalloc.is_tracing():
+            return {}, []
+        # allocations with the same traceback are grouped first
+        stats = tracemalloc.take_snapshot().statistics('traceback')
+        with self._lock:
+            functions = dict((name, {'tasks': s[0], 'allocated': s[1], 'peak': s[2], 'live': 0, 'blocks': 0}) for name, s in self._tasks.items())
+            sites = collections.Counter()
+            blocks = collections.Counter()
+            for stat in stats:
+                for frame in reversed(stat.traceback):
+                    name = self.owner(frame.filename, frame.lineno)
+                    if name is not None:
+                        break
+                else:
+                    continue
+                f = functions.setdefault(name, {'tasks': 0, 'allocated': 0, 'peak': None, 'live': 0, 'blocks': 0})
+                f['live'] += stat.size
+                f['blocks'] += stat.count
+                site = "%s:%d" % (stat.traceback[-1].filename, stat.traceback[-1].lineno)
+                sites[site] += stat.size
+                blocks[site] += stat.count
+        return functions, [(line, size, blocks[line]) for line, size in sites.most_common(limit)]
+
+    def report(self, limit=TOP_DEFAULT):
+        functions, sites = self.statistics(limit)
+        lines = ["%-30s %7s %14s %14s %14s %8s" % ("Function", "Tasks", "Net allocated", "Max peak", "Live", "Blocks")]
+        for name, f in sorted(functions.items(), key=lambda item: -item[1]['live']):
+            lines.append("%-30s %7d %14d %14s %14d %8d" % (name[:30], f['tasks'], f['allocated'], '-' if f['peak'] is None else f['peak'], f['live'], f['blocks']))
+        lines.append('')
+        lines.append("Top allocation sites")
+        for line, size, count in sites:
+            lines.append("%14d B %8d blocks  %s" % (size, count, line))
+        return '\n'.join(lines)
+
+    def saveStats(self):
+        print(self.report())
+        if self._tracing:
+            tracemalloc.stop()
@@ -0,0 +1,330 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import array
+import copy
+import os
+import queue
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+from pykron.journal import STATUSES
+
+SUBMIT    = 0
+START     = 1
+FINISH    = 2
+TIMEOUT   = 3
+CANCEL    = 4
+PROPAGATE = 5
+REJECT    = 6
+EVENTS = ('SUBMIT', 'START', 'FINISH', 'TIMEOUT', 'CANCEL', 'PROPAGATE', 'REJECT')
+
+# directory of the default dump path, the temporary directory if None
+DIRECTORY = None
+
+def dump_path(pid=None):
+    ''' default path of the flight recorder dumps of the process pid
+    '''
+    if pid is None:
+        pid = os.getpid()
+    return os.path.join(DIRECTORY or tempfile.gettempdir(), "pykron-flight-%d.log" % pid)
+
+class ThreadRing:
+    ''' Ring buffer of the events recorded by one thread
+
+    The slots are preallocated arrays and only the owner thread writes, so
+    recording takes no lock. A dump taken while the owner is recording may
+    show its newest slot half written. The ring of a finished thread is
+    handed over to the next new thread, its events are kept until they are
+    overwritten.
+    '''
+
+    def __init__(self, size):
+        self._size = size
+        self._owner = None
+        self._count = 0
+        self._stamps = array.array('d', bytes(8 * size))
+        self._events = array.array('b', bytes(size))
+        self._threads = array.array('Q', bytes(8 * size))
+        self._tasks = array.array('q', bytes(8 * size))
+        self._args = array.array('q', bytes(8 * size))
+
+    @property
+    def owner(self):
+        return self._owner
+
+    def copy(self):
+        ''' a copy of the recorded events, taken without stopping the owner
+        '''
+        ring = copy.copy(self)
+        for name in ('_stamps', '_events', '_threads', '_tasks', '_args'):
+            setattr(ring, name, getattr(self, name)[:])
+        return ring
+
+    def set_owner(self, thread):
+        self._owner = thread
+
+    def record(self, event, task_id, arg):
+        i = self._count % self._size
+        self._stamps[i] = time.perf_counter()
+        self._events[i] = event
+        self._threads[i] = self._owner.ident
+        self._tasks[i] = task_id
+        self._args[i] = arg
+        self._count += 1
+
+    def events(self):
+        ''' the recorded events, oldest first, as (stamp, thread ident, event,
+        task id, arg)
+        '''
+        count = self._count
+        slots = [i % self._size for i in range(max(0, count - self._size), count)]
+        return [(self._stamps[i], self._threads[i], self._events[i], self._tasks[i], self._args[i]) for i in slots]
+
+class FlightRecorder:
+    ''' Recorder of the recent runtime events
+
+    Each thread records submit, start, finish, timeout, cancel, propagation
+    and reject events, with the task id and a perf_counter stamp, in its own
+    ring of size slots, rings are reused once their thread is finished. The
+    rings are dumped to path when a task fails or times out (at most once
+    every DUMP_INTERVAL seconds), when the process receives SIGUSR1 and on
+    uncaught exceptions. The rings are copied by the caller and written by
+    a background thread, except on uncaught exceptions. Each dump replaces
+    the file, the previous backups dumps are kept as path.1, path.2...
+    The process-global hooks (signum handler, sys.excepthook and
+    threading.excepthook) are only installed with hooks=True and restored
+    by close().
+    The argument of an event is
+    the parent id for SUBMIT, the index of the status in STATUSES for FINISH
+    and REJECT, and the cancelled parent for PROPAGATE.
+    '''
+
+    SIZE_DEFAULT = 1024
+    BACKUPS_DEFAULT = 2
+    DUMP_INTERVAL = 1.0
+
+    def __init__(self, size=SIZE_DEFAULT, path=None, signum=getattr(signal, 'SIGUSR1', None), backups=BACKUPS_DEFAULT, hooks=True):
+        self._size = size
+        self._path = path or dump_path()
+        self._backups = backups
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._rings = []
+        self._last_dump = None
+        self._dumps = 0
+        self._signum = None
+        self._previous_signal = None
+        self._previous_excepthook = sys.excepthook
+        self._previous_threading_excepthook = threading.excepthook
+        if not hooks:
+            return
+        if signum is not None and threading.current_thread() is threading.main_thread() and signal.getsignal(signum) == signal.SIG_DFL:
+            self._previous_signal = signal.signal(signum, self.on_signal)
+            self._signum = signum
+        sys.excepthook = self.excepthook
+        threading.excepthook = self.threading_excepthook
+
+    @property
+    def dumps(self):
+        return self._dumps
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def size(self):
+        return self._size
+
+    def ring(self):
+        ring = getattr(self._local, 'ring', None)
+        if ring is None:
+            thread = threading.current_thread()
+            with self._lock:
+                for ring in self._rings:
+                    if not ring.owner.is_alive():
+                        break
+                else:
+                    ring = ThreadRing(self._size)
+                    self._rings.append(ring)
+                ring.set_owner(thread)
+            self._local.ring = ring
+        return ring
+
+    def record(self, event, task_id, arg=-1):
+        self.ring().record(event, task_id, -1 if arg is None else arg)
+
+    def submit(self, task):
+        self.record(SUBMIT, task.task_id, task.parent_id)
+
+    def start(self, task):
+        self.record(START, task.task_id)
+
+    def finish(self, task):
+        self.record(FINISH, task.task_id, STATUSES.index(task.status))
+
+    def timeout(self, task):
+        self.record(TIMEOUT, task.task_id)
+
+    def cancel(self, task):
+        self.record(CANCEL, task.task_id)
+
+    def propagate(self, task, parent_id):
+        self.record(PROPAGATE, task.task_id, parent_id)
+
+    def reject(self, task):
+        self.record(REJECT, task.task_id, STATUSES.index(task.status))
+
+    def rings(self):
+        ''' copies of the rings of all threads '''
+        with self._lock:
+            return [ring.copy() for ring in self._rings]
+
+    def events(self, rings=None):
+        ''' the events of all threads ordered by stamp, as (stamp, thread
+        ident, event, task id, arg)
+        '''
+        if rings is None:
+            rings = self.rings()
+        events = []
+        for ring in rings:
+            events.extend(ring.events())
+        events.sort()
+        return events
+
+    def format(self, reason, rings=None, now=None):
+        if now is None:
+            now = time.perf_counter()
+        lines = ["=== pykron flight recorder, pid %d, %s: %s" % (os.getpid(), time.strftime('%Y-%m-%d %H:%M:%S'), reason)]
+        for stamp, thread, event, task_id, arg in self.events(rings):
+            if arg < 0:
+                detail = ''
+            elif event in (FINISH, REJECT):
+                detail = ' ' + STATUSES[arg]
+            elif event == SUBMIT:
+                detail = ' parent T%d' % arg
+            else:
+                detail = ' -> T%d' % arg
+            lines.append("%12.6fs %16d %-9s T%d%s" % (stamp - now, thread, EVENTS[event], task_id, detail))
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, reason, force=True, wait=False):
+        ''' dumps the recorded events to path, unless force is False and the
+        last dump is more recent than DUMP_INTERVAL. The file is written by
+        the writer thread, or by the caller if wait is True. Returns whether
+        it dumped.
+        '''
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_dump is not None and now - self._last_dump < FlightRecorder.DUMP_INTERVAL:
+                return False
+            self._last_dump = now
+            self._dumps += 1
+            rings = [ring.copy() for ring in self._rings]
+        item = (reason, rings, time.perf_counter())
+        if wait:
+            self.write(*item)
+            return True
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="PykronFlightRecorder", daemon=True)
+                self._writer.start()
+        self._queue.put(item)
+        return True
+
+    def flush(self):
+        ''' waits for the pending dumps to be written '''
+        self._queue.join()
+
+    def write(self, reason, rings, now):
+        for i in range(self._backups, 0, -1):
+            source = self._path if i == 1 else "%s.%d" % (self._path, i - 1)
+            if os.path.exists(source):
+                os.replace(source, "%s.%d" % (self._path, i))
+        with open(self._path, 'w') as f:
+            f.write(self.format(reason, rings, now))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.write(*item)
+            except OSError:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def on_signal(self, signum, frame):
+        self.dump("signal %d" % signum)
+
+    def excepthook(self, exc_type, exc_value, exc_traceback):
+        # the process may be exiting, the dump is written right away
+        self.dump("uncaught %s" % exc_type.__name__, wait=True)
+        self._previous_excepthook(exc_type, exc_value, exc_traceback)
+
+    def threading_excepthook(self, args):
+        self.dump("uncaught %s in thread %s" % (args.exc_type.__name__, args.thread.name if args.thread else None), wait=True)
+        self._previous_threading_excepthook(args)
+
+    def close(self):
+        ''' writes the pending dumps, restores the signal handler and the
+        exception hooks
+        '''
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        if self._signum is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(self._signum, self._previous_signal)
+            self._signum = None
+        if sys.excepthook == self.excepthook:
+            sys.excepthook = self._previous_excepthook
+        if threading.excepthook == self.threading_excepthook:
+            threading.excepthook = self._previous_threading_excepthook
+
+    def reinitialize(self):
+        ''' drops the rings of the threads of the parent in a forked child '''
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._rings = []
+        self._queue = queue.Queue()
+        self._writer = None
@@ -0,0 +1,288 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import argparse
+import collections
+import csv
+import logging
+import os
+import sys
+import time
+
+from pykron.core import Pykron
+from pykron.journal import MAGIC, JournalReader
+
+USAGE = '''python -m pykron.replay RUN [-t sleep|cpu] [-s SPEED] [--timeout T] [-f NAME=TIMEOUT] [-p NAME=PRIORITY] [--pool MIN:MAX] [--admission] [-o DIR]
+
+Replays the arrival pattern of RUN, a CSV file saved by PykronLogger
+(save_csv=True) or a journal (save_journal=True), with synthetic tasks that
+sleep or burn CPU for the recorded durations. Children are spawned by their
+parents at the recorded offsets. The replayed run can be saved in DIR and
+compared with RUN by python -m pykron.analyze.'''
+
+Record = collections.namedtuple('Record', 'task_id parent_id func_name arrival start duration status')
+
+class ReplayError(Exception):
+    ''' raised by a synthetic task whose recorded execution failed '''
+
+def load(path):
+    ''' loads the execution records of a run, ordered by arrival '''
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        records = load_journal(path)
+    else:
+        records = load_csv(path)
+    return sorted(records, key=lambda r: r.arrival)
+
+def load_csv(path):
+    ''' records of a CSV log, without the Task id column (logs saved by older
+    versions) every task is replayed as a root task
+    '''
+    def number(value, cast=float):
+        return None if value in ('', 'None') else cast(value)
+
+    records = []
+    with open(path, newline='') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            records.append(Record(number(row.get('Task id', str(-i - 1)), int),
+                                  number(row.get('Parent id', ''), int),
+                                  row['Function'],
+                                  number(row['Arrival Ts']),
+                                  number(row['Start Ts']),
+                                  number(row['Duration']),
+                                  row['Status']))
+    return records
+
+def load_journal(path):
+    reader = JournalReader(path)
+    try:
+        return [Record(r['task_id'], r['parent_id'], r['func_name'], r['arrival_ts'], r['start_ts'], r['duration'], r['status']) for r in reader]
+    finally:
+        reader.close()
+
+def burn(duration):
+    ''' keeps the calling thread busy for duration seconds '''
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+class Workload:
+    ''' Recorded tasks grouped into root tasks, replayed at their arrival
+    offsets, and children, spawned by their parent when replayed. A task
+    whose parent is not in the recording is a root task.
+    '''
+
+    def __init__(self, records):
+        ids = set(r.task_id for r in records)
+        self._roots = []
+        self._children = collections.defaultdict(list)
+        for r in records:
+            if r.parent_id is not None and r.parent_id in ids:
+                self._children[r.parent_id].append(r)
+            else:
+                self._roots.append(r)
+        self._size = len(records)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def roots(self):
+        return self._roots
+
+    def children(self, record):
+        return self._children.get(record.task_id, [])
+
+class Replay:
+    ''' Replays a Workload on the current Pykron instance
+
+    target is 'sleep' or 'cpu'. speed > 1 compresses the recorded times.
+    Every task gets the timeout of its function in timeouts, or timeout,
+    and the priority of its function in priorities. With failures=True the
+    tasks that failed in the recording raise ReplayError.
+    '''
+
+    TARGETS = ('sleep', 'cpu')
+
+    def __init__(self, workload, target='sleep', speed=1.0, timeout=Pykron.TIMEOUT_DEFAULT, timeouts=None, priorities=None, failures=True):
+        if target not in Replay.TARGETS:
+            raise ValueError("unknown target %s, expected one of %s" % (target, ', '.join(Replay.TARGETS)))
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self._workload = workload
+        self._spend = Pykron.sleep if target == 'sleep' else burn
+        self._speed = speed
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+        self._priorities = priorities or {}
+        self._failures = failures
+        self._functions = {}
+        self._requests = []
+
+    @property
+    def requests(self):
+        ''' (record, request) of the replayed tasks, in submission order '''
+        return self._requests
+
+    def function(self, name):
+        ''' the decorated synthetic function replaying the tasks of name '''
+        if name not in self._functions:
+            def body(record):
+                self.execute(record)
+            body.__name__ = body.__qualname__ = name
+            self._functions[name] = Pykron.AsyncRequest(timeout=self._timeouts.get(name, self._timeout),
+                                                        priority=self._priorities.get(name, 0))(body)
+        return self._functions[name]
+
+    def submit(self, record):
+        req = self.function(record.func_name)(record)
+        self._requests.append((record, req))
+        return req
+
+    def execute(self, record):
+        ''' spawns the children of record at their offsets from its start, then
+        spends the rest of its recorded duration
+        '''
+        start = time.perf_counter()
+        for child in self._workload.children(record):
+            self.wait_until(start + (child.arrival - record.start) / self._speed)
+            self.submit(child)
+        self.wait_until(start + (record.duration or 0.0) / self._speed)
+        if self._failures and record.status == 'FAILED':
+            raise ReplayError("T%d failed in the recorded run" % record.task_id)
+
+    def wait_until(self, deadline):
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            self._spend(delay)
+
+    def run(self):
+        ''' replays the workload and waits for all the tasks to complete,
+        returns the list of (record, request)
+        '''
+        roots = self._workload.roots
+        if roots:
+            t0 = roots[0].arrival
+            start = time.perf_counter()
+            for record in roots:
+                delay = start + (record.arrival - t0) / self._speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.submit(record)
+        # children are submitted before their parent completes
+        i = 0
+        while i < len(self._requests):
+            self._requests[i][1].completed.wait()
+            i += 1
+        return self._requests
+
+def percentile(values, p):
+    ''' nearest-rank percentile of a sorted list '''
+    if not values:
+        return None
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+def summary(requests):
+    ''' per-function statistics of a replay: count, number of tasks per
+    status, and p50/p99 latency (arrival to completion) of the completed tasks
+    '''
+    stats = {}
+    for record, req in requests:
+        task = req.task
+        s = stats.setdefault(record.func_name, {'count': 0, 'statuses': collections.Counter(), 'latency': []})
+        s['count'] += 1
+        s['statuses'][task.status] += 1
+        if task.end_ts is not None:
+            s['latency'].append(task.end_ts - task.arrival_ts)
+    for s in stats.values():
+        latency = sorted(s.pop('latency'))
+        s['latency'] = {50: percentile(latency, 50), 99: percentile(latency, 99)}
+    return stats
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value < 1.0:
+        return "%.3fms" % (value * 1000)
+    return "%.3fs" % value
+
+def format_summary(stats):
+    lines = ["%-30s %7s %9s %9s %9s %9s %12s %12s" % ("Function", "Count", "succeed", "failed", "timeout", "rejected", "latency p50", "latency p99")]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['count']):
+        st = s['statuses']
+        lines.append("%-30s %7d %9d %9d %9d %9d %12s %12s" % (
+            name[:30], s['count'], st['SUCCEED'], st['FAILED'], st['TIMEOUT'], st['REJECTED'] + st['CANCELLED'],
+            format_seconds(s['latency'][50]), format_seconds(s['latency'][99])))
+    return '\n'.join(lines)
+
+def parse_assignments(values, cast):
+    result = {}
+    for value in values or []:
+        name, sep, number = value.rpartition('=')
+        if not sep:
+            raise SystemExit("expected NAME=VALUE, got %s" % value)
+        result[name] = cast(number)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pykron.replay', usage=USAGE)
+    parser.add_argument('run', help="CSV or journal of the recorded run")
+    parser.add_argument('-t', '--target', choices=Replay.TARGETS, default='sleep', help="how synthetic tasks spend their duration")
+    parser.add_argument('-s', '--speed', type=float, default=1.0, help="replay speed factor")
+    parser.add_argument('--timeout', type=float, default=Pykron.TIMEOUT_DEFAULT, help="timeout of every task")
+    parser.add_argument('-f', '--function-timeout', action='append', metavar='NAME=TIMEOUT', help="timeout of the tasks of a function")
+    parser.add_argument('-p', '--priority', action='append', metavar='NAME=PRIORITY', help="priority of the tasks of a function")
+    parser.add_argument('--pool', metavar='MIN:MAX', help="run the tasks on a PykronPool of MIN to MAX workers")
+    parser.add_argument('--admission', action='store_true', help="enable admission control")
+    parser.add_argument('-o', '--output', metavar='DIR', help="save the CSV and the journal of the replay in DIR")
+    args = parser.parse_args(argv)
+    pool = False
+    if args.pool:
+        from pykron.pool import PykronPool
+        min_workers, _, max_workers = args.pool.partition(':')
+        pool = PykronPool(int(min_workers), int(max_workers or min_workers))
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    app = Pykron(logging_level=logging.CRITICAL, pool=pool, admission_control=args.admission,
+                 save_csv=bool(args.output), save_journal=bool(args.output), logging_path=args.output or Pykron.LOGGING_PATH)
+    try:
+        workload = Workload(load(args.run))
+        replay = Replay(workload, args.target, args.speed, args.timeout,
+                        parse_assignments(args.function_timeout, float), parse_assignments(args.priority, int))
+        print(format_summary(summary(replay.run())))
+    finally:
+        app.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+from multiprocessing import resource_tracker, shared_memory
+import sys
+import threading
+
+# names of the segments created by the pools of this process
+_owned = set()
+
+# nesting levels of containers searched by references()
+REFERENCE_DEPTH = 3
+
+def references(value, depth=REFERENCE_DEPTH):
+    ''' yields value and the items of the tuples, lists, sets and dict values
+    nested in it, down to depth levels
+    '''
+    yield value
+    if depth <= 0:
+        return
+    if isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        items = value
+    else:
+        return
+    for item in items:
+        yield from references(item, depth - 1)
+
+def _exporter(obj):
+    ''' the object exporting the memory of a memoryview or of an array
+    created from one (following the numpy base chain), None otherwise
+    '''
+    while obj is not None and not isinstance(obj, memoryview):
+        obj = getattr(obj, 'base', None)
+    return obj.obj if obj is not None else None
+
+def _attach(name, size):
+    if sys.version_info >= (3, 13):
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        segment = shared_memory.SharedMemory(name=name)
+        if name not in _owned:
+            # the segment is owned by the process that created it, the tracker
+            # of the attaching process must not unlink it at exit
+            resource_tracker.unregister(segment._name, 'shared_memory')
+    return SharedBuffer(segment, size)
+
+class SharedBuffer:
+    ''' Buffer living in a shared memory segment
+
+    Pickling a SharedBuffer only transfers the name of the segment, so it can
+    be sent to another process without copying its content. The receiving
+    process maps the same memory.
+    '''
+
+    def __init__(self, segment, size, pool=None):
+        self._segment = segment
+        self._size = size
+        self._pool = pool
+        self._task_id = None
+
+    @property
+    def buf(self):
+        return self._segment.buf[:self._size]
+
+    @property
+    def name(self):
+        return self._segment.name
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def task_id(self):
+        ''' the task owning the buffer, None if the buffer is not bound to a task
+        '''
+        return self._task_id
+
+    def as_array(self, dtype, shape=None):
+        import numpy
+        arr = numpy.frombuffer(self._segment.buf, dtype=dtype, count=self._size // numpy.dtype(dtype).itemsize)
+        if shape is not None:
+            arr = arr.reshape(shape)
+        return arr
+
+    def backs(self, obj):
+        ''' True if obj is the buffer or a view of its memory, e.g. buf or an
+        array returned by as_array()
+        '''
+        if obj is self:
+            return True
+        if self._segment is None or isinstance(obj, SharedBuffer):
+            return False
+        exporter = _exporter(obj)
+        return exporter is not None and exporter is self._segment.buf.obj
+
+    def bind(self, task_id):
+        self._task_id = task_id
+
+    def detach(self):
+        ''' unbinds the buffer from its task, the caller becomes responsible for
+        releasing it
+        '''
+        self._task_id = None
+
+    def release(self):
+        if self._segment is None:
+            return
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            try:
+                self._segment.close()
+            except BufferError:
+                pass
+        self._segment = None
+
+    def __len__(self):
+        return self._size
+
+    def __reduce__(self):
+        return (_attach, (self._segment.name, self._size))
+
+class SegmentPool:
+    ''' Pooled allocator of shared memory segments
+
+    Segments are rounded up to a power of two (at least MIN_SEGMENT bytes)
+    and kept in a free list per size class when released, so that a steady
+    stream of large payloads does not create and unlink a segment per call.
+    At most max_cached bytes are kept in the free lists.
+    '''
+
+    MIN_SEGMENT = 1 << 16
+    MAX_CACHED_DEFAULT = 1 << 28
+
+    def __init__(self, max_cached=MAX_CACHED_DEFAULT):
+        self._max_cached = max_cached
+        self._cached = 0
+        self._free = {}
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cached(self):
+        return self._cached
+
+    @property
+    def segments(self):
+        return len(self._segments)
+
+    def allocate(self, size):
+        capacity = SegmentPool.size_class(size)
+        with self._lock:
+            free = self._free.get(capacity)
+            if free:
+                segment = free.pop()
+                self._cached -= capacity
+            else:
+                segment = shared_memory.SharedMemory(create=True, size=capacity)
+                self._segments[segment.name] = segment
+                _owned.add(segment.name)
+        return SharedBuffer(segment, size, self)
+
+    def share(self, obj):
+        ''' copies a buffer-protocol object into a pooled segment
+        '''
+        view = memoryview(obj).cast('B')
+        shared = self.allocate(view.nbytes)
+        shared.buf[:] = view
+        return shared
+
+    def release(self, shared):
+        segment = shared._segment
+        capacity = segment.size
+        with self._lock:
+            if self._cached + capacity <= self._max_cached:
+                self._free.setdefault(capacity, []).append(segment)
+                self._cached += capacity
+                return
+            self._segments.pop(segment.name, None)
+        SegmentPool.destroy(segment)
+
+    def close(self):
+        with self._lock:
+            segments = list(self._segments.values())
+            self._segments.clear()
+            self._free.clear()
+            self._cached = 0
+        for segment in segments:
+            SegmentPool.destroy(segment)
+
+    def reinitialize(self):
+        ''' forgets the segments in a forked child, they belong to the parent
+        which unlinks them
+        '''
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._free = {}
+        self._cached = 0
+        _owned.clear()
+
+    @staticmethod
+    def destroy(segment):
+        _owned.discard(segment.name)
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            segment.close()
+        except BufferError:
+            # still exported through a live memoryview, the mapping goes away
+            # with it
+            pass
+
+    @staticmethod
+    def size_class(size):
+        capacity = SegmentPool.MIN_SEGMENT
+        while capacity < size:
+            capacity <<= 1
+        return capacity
@@ -0,0 +1,118 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import collections
+import threading
+
+class TaskStream:
+    ''' Bounded buffer between a generator task and its consumer
+
+    The producer blocks while the buffer is full. It polls while waiting so
+    that the exceptions raised by Pykron.stop_thread on cancel or timeout are
+    delivered promptly. The consumer iterates until the producer closes the
+    stream.
+    '''
+
+    BUFFER_DEFAULT = 16
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, maxsize=BUFFER_DEFAULT):
+        if maxsize < 1:
+            raise ValueError("stream buffer size must be at least 1")
+        self._maxsize = maxsize
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._abandoned = False
+        self._produced = 0
+        self._consumed = 0
+
+    @property
+    def abandoned(self):
+        return self._abandoned
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def consumed(self):
+        return self._consumed
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def produced(self):
+        return self._produced
+
+    def abandon(self):
+        ''' called by the consumer to stop the producer at the next item
+        '''
+        with self._cond:
+            self._abandoned = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def put(self, item):
+        ''' returns False if the consumer abandoned the stream
+        '''
+        with self._cond:
+            while len(self._items) >= self._maxsize and not self._abandoned:
+                self._cond.wait(TaskStream.POLL_INTERVAL)
+            if self._abandoned:
+                return False
+            self._items.append(item)
+            self._produced += 1
+            self._cond.notify_all()
+            return True
+
+    def __iter__(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._items and not self._closed:
+                        self._cond.wait()
+                    if not self._items:
+                        return
+                    item = self._items.popleft()
+                    self._consumed += 1
+                    self._cond.notify_all()
+                yield item
+        except GeneratorExit:
+            self.abandon()
+            raise
@@ -31,16 +31,45 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from pykron.core import Pykron
 from pykron.logging import PykronLogger
+from pykron import recorder
 
+import tempfile
 import unittest
 
 class PykronTest(unittest.TestCase):
+    ''' the flight recorder dumps of the tests go to a temporary directory
+    removed after the tests of the class
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls._recorder_dir = tempfile.TemporaryDirectory()
+        cls._recorder_default = recorder.DIRECTORY
+        recorder.DIRECTORY = cls._recorder_dir.name
+
+    @classmethod
+    def tearDownClass(cls):
+        recorder.DIRECTORY = cls._recorder_default
+        cls._recorder_dir.cleanup()
 
     def setUp(self):
         app = Pykron.getInstance()
-        self.assertTrue(app.loop.is_running())
+        self.assertFalse(app.running)
 
     def tearDown(self):
         app = Pykron.getInstance()
         app.close()
-        self.assertFalse(app.loop.is_running())
+        self.assertFalse(app.running)
+
+class PykronVirtualTest(PykronTest):
+    ''' runs the test on a VirtualClock: time only moves when the test calls
+    self.clock.advance()
+    '''
+
+    def setUp(self):
+        Pykron(virtual_clock=True)
+        super().setUp()
+
+    @property
+    def clock(self):
+        return Pykron.getInstance().clock
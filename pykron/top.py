@@ -0,0 +1,124 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+from pykron.monitor import read_snapshot, socket_path
+
+USAGE = '''python -m pykron.top [pid|socket] [-i INTERVAL] [-n ITERATIONS]
+
+Shows the tasks of a process running Pykron(monitor=True). Without pid the
+only monitor socket found in the temporary directory is used.'''
+
+CLEAR = '\033[H\033[2J'
+
+def find_socket(target):
+    if target is None:
+        paths = glob.glob(os.path.join(tempfile.gettempdir(), 'pykron-*.sock'))
+        if len(paths) != 1:
+            raise SystemExit("%d monitor sockets found, choose one: %s" % (len(paths), ' '.join(paths)))
+        return paths[0]
+    if target.isdigit():
+        return socket_path(int(target))
+    return target
+
+def format_duration(value):
+    if value is None:
+        return '-'
+    if value < 1.0:
+        return "%.1fms" % (value * 1000)
+    return "%.2fs" % value
+
+def render(snapshot, previous=None, elapsed=None, limit=20):
+    tasks = snapshot['tasks']
+    running = sum(1 for t in tasks if t['status'] == 'RUNNING')
+    lines = ["pid %d - tasks: %d running, %d queued - timers: %d - completed: %d, rejected: %d" % (
+        snapshot['pid'], running, len(tasks) - running, snapshot['timers'], snapshot['completed'], snapshot['rejected'])]
+    if previous is not None and elapsed:
+        done = snapshot['completed'] - previous['completed']
+        latency = (snapshot['busy_time'] - previous['busy_time']) / done if done else None
+        lines.append("throughput: %.1f tasks/s - mean duration: %s" % (done / elapsed, format_duration(latency)))
+        busy = snapshot['busy_time'] - previous['busy_time']
+        if busy > 0:
+            cpu = (snapshot['cpu_time'] - previous['cpu_time']) / busy
+            wait = (snapshot['wait_time'] - previous['wait_time']) / busy
+            lines.append("task time: %.0f%% on CPU, %.0f%% waiting for requests, %.0f%% blocked or runnable" % (cpu * 100, wait * 100, max(0.0, 1 - cpu - wait) * 100))
+    pool = snapshot['pool']
+    if pool is not None:
+        lines.append("pool: %d workers, %d busy, %d idle, %d blocked, %d queued - queue delay %s" % (
+            pool['workers'], pool['busy'], pool['idle'], pool['blocked'], pool['queued'], format_duration(pool['queue_delay'])))
+    lines.append('')
+    lines.append("%8s %8s %16s %-9s %10s %10s  %s" % ("TID", "PARENT", "THREAD", "STATUS", "AGE", "REMAINING", "FUNCTION"))
+    for t in sorted(tasks, key=lambda t: t['age'], reverse=True)[:limit]:
+        lines.append("%8d %8s %16s %-9s %10s %10s  %s %s" % (
+            t['task_id'], t['parent_id'] if t['parent_id'] is not None else '-', t['thread_id'] or '-', t['status'],
+            format_duration(t['age']), format_duration(t['remaining']), t['func_name'], t['func_loc']))
+    if len(tasks) > limit:
+        lines.append("... %d more" % (len(tasks) - limit))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pykron.top', usage=USAGE)
+    parser.add_argument('target', nargs='?', help="pid or path of the monitor socket")
+    parser.add_argument('-i', '--interval', type=float, default=1.0, help="refresh interval in seconds")
+    parser.add_argument('-n', '--iterations', type=int, default=None, help="exit after this many refreshes")
+    parser.add_argument('-l', '--limit', type=int, default=20, help="maximum number of tasks shown")
+    args = parser.parse_args(argv)
+    path = find_socket(args.target)
+    previous = None
+    previous_ts = None
+    iteration = 0
+    try:
+        while args.iterations is None or iteration < args.iterations:
+            try:
+                snapshot = read_snapshot(path)
+            except OSError as e:
+                raise SystemExit("cannot read %s: %s" % (path, e))
+            now = time.perf_counter()
+            elapsed = None if previous_ts is None else now - previous_ts
+            output = render(snapshot, previous, elapsed, args.limit)
+            if sys.stdout.isatty():
+                output = CLEAR + output
+            print(output, flush=True)
+            previous, previous_ts = snapshot, now
+            iteration += 1
+            if args.iterations is None or iteration < args.iterations:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import time
+from pykron.clock import VirtualClock
+from pykron.core import Pykron, PykronAdmission, PykronPool, Task
+from pykron.test import PykronTest
+
+
+class TestAdmission(PykronTest):
+
+    def overload(self, admission):
+        admission.observe(1.0)
+        time.sleep(admission.interval)
+        admission.observe(1.0)
+
+    def test_overload_detection(self):
+        ''' tests that a sustained queueing delay above the target sheds low priorities
+        '''
+        admission = PykronAdmission(target=0.01, interval=0.05)
+        self.assertTrue(admission.admit(0))
+        self.overload(admission)
+        self.assertTrue(admission.overloaded)
+        self.assertFalse(admission.admit(0))
+        self.assertTrue(admission.admit(1))
+        self.assertEqual(admission.shed, 1)
+
+    def test_overload_recovery(self):
+        ''' tests that the controller leaves the overload state once the delay drops
+        '''
+        admission = PykronAdmission(target=0.01, interval=0.05)
+        self.overload(admission)
+        admission.observe(0.0)
+        time.sleep(admission.interval)
+        self.assertTrue(admission.admit(0))
+        self.assertFalse(admission.overloaded)
+
+    def test_stuck_queue(self):
+        ''' tests that shedding continues while no task starts and the queue head ages
+        '''
+        clock = VirtualClock()
+        ages = [1.0]
+        admission = PykronAdmission(target=0.01, interval=0.05, clock=clock, queue_age=lambda: ages[0])
+        admission.observe(1.0)
+        clock.advance(admission.interval)
+        admission.observe(1.0)
+        self.assertTrue(admission.overloaded)
+        for _ in range(3):
+            clock.advance(admission.interval)
+            self.assertFalse(admission.admit(0))
+        ages[0] = None
+        clock.advance(admission.interval)
+        self.assertTrue(admission.admit(0))
+
+    def test_attach(self):
+        ''' tests that the runtime gives its clock and pool queue to the controller
+        '''
+        Pykron.close()
+        clock = VirtualClock()
+        admission = PykronAdmission(target=0.01, interval=0.05)
+        app = Pykron(admission_control=admission, pool=True, virtual_clock=clock)
+        self.assertIs(admission.clock, clock)
+        self.assertIs(app.pool.clock, clock)
+        self.assertIsNone(app.pool.queue_age)
+
+    def test_virtual_queue_age(self):
+        ''' tests that the age of the pool queue is measured on the runtime clock
+        '''
+        clock = VirtualClock()
+        pool = PykronPool(min_workers=0, max_workers=1, clock=clock)
+        started = threading.Event()
+        release = threading.Event()
+        pool.submit(lambda: (started.set(), release.wait(1.0)))
+        started.wait(1.0)
+        pool.submit(lambda: None)
+        clock.advance(2.0)
+        self.assertEqual(pool.queue_age, 2.0)
+        release.set()
+        pool.shutdown()
+
+    def test_request_rejected(self):
+        ''' tests that shed requests are never dispatched and get Task.REJECTED
+        '''
+        Pykron.close()
+        admission = PykronAdmission(target=0.01, interval=0.5)
+        Pykron(admission_control=admission)
+        self.overload(admission)
+
+        @Pykron.AsyncRequest(priority=0)
+        def low():
+            return 1
+
+        @Pykron.AsyncRequest(priority=1)
+        def high():
+            return 2
+
+        req = low()
+        self.assertIsNone(req.wait_for_completed())
+        self.assertEqual(req.task.status, Task.REJECTED)
+        self.assertEqual(high().wait_for_completed(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import csv
+import os
+import tempfile
+from pykron.core import Pykron
+from pykron.journal import PykronJournal
+from pykron.test import PykronTest
+
+try:
+    import numpy
+    from pykron import analyze
+except ImportError:
+    numpy = None
+
+HEADERS = ["Timestamp", "Function", "Location", "Caller function", "Caller location", "Status", "Arrival Ts", "Start Ts", "End Ts", "Duration", "Idle time", "Return value", "Exception", "Args"]
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestAnalyze(PykronTest):
+
+    def setUp(self):
+        super().setUp()
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        super().tearDown()
+        self._tmpdir.cleanup()
+
+    def write_csv(self, name, executions):
+        ''' executions are (function, status, start, duration) tuples
+        '''
+        path = os.path.join(self._tmpdir.name, name)
+        with open(path, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            for func, status, start, duration in executions:
+                writer.writerow([0, func, '[a.py:1]', 'main', '[a.py:9]', status, start, start, start + duration, duration, 0.0, None, None, ()])
+        return path
+
+    def test_function_stats(self):
+        executions = [('foo', 'SUCCEED', i * 0.1, (i + 1) * 0.01) for i in range(100)]
+        executions += [('bar', 'FAILED', 0.0, 0.5), ('bar', 'TIMEOUT', 0.0, 1.0), ('bar', 'SUCCEED', 0.0, 0.1)]
+        stats = analyze.function_stats(analyze.load(self.write_csv('run.csv', executions)))
+        foo = stats['foo [a.py:1]']
+        self.assertEqual(foo['count'], 100)
+        self.assertAlmostEqual(foo['duration'][50], 0.50)
+        self.assertAlmostEqual(foo['duration'][99], 0.99)
+        self.assertAlmostEqual(foo['duration'][100], 1.0)
+        bar = stats['bar [a.py:1]']
+        self.assertAlmostEqual(bar['failure_rate'], 1/3)
+        self.assertAlmostEqual(bar['timeout_rate'], 1/3)
+
+    def test_timeline(self):
+        ''' three overlapping tasks in the first second, one in the second
+        '''
+        executions = [('foo', 'SUCCEED', 0.0, 0.5), ('foo', 'SUCCEED', 0.1, 0.5), ('foo', 'SUCCEED', 0.2, 0.5), ('foo', 'SUCCEED', 1.2, 0.1)]
+        starts, throughput, concurrency = analyze.timeline(analyze.load(self.write_csv('run.csv', executions)), 1.0)
+        self.assertEqual(list(starts), [0.0, 1.0])
+        self.assertEqual(list(throughput), [3.0, 1.0])
+        self.assertEqual(list(concurrency), [3, 1])
+
+    def test_diff(self):
+        base = self.write_csv('base.csv', [('foo', 'SUCCEED', 0.0, 0.1)] * 10 + [('bar', 'SUCCEED', 0.0, 0.1)] * 10)
+        candidate = self.write_csv('candidate.csv', [('foo', 'SUCCEED', 0.0, 0.2)] * 10 + [('bar', 'SUCCEED', 0.0, 0.1)] * 10)
+        rows = analyze.diff(analyze.function_stats(analyze.load(base)), analyze.function_stats(analyze.load(candidate)))
+        regressions = set((name, metric) for name, metric, old, new, regression in rows if regression)
+        self.assertEqual(regressions, {('foo [a.py:1]', 'p50'), ('foo [a.py:1]', 'p99')})
+        self.assertEqual(analyze.main([base, candidate]), 1)
+        self.assertEqual(analyze.main([base, base]), 0)
+
+    def test_journal(self):
+        ''' tests that a journal loads the same records as the CSV
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return 1/x
+
+        requests = [inner_fun(i) for i in range(4)]
+        Pykron.join(requests)
+        path = os.path.join(self._tmpdir.name, 'run.pkj')
+        journal = PykronJournal(path)
+        for req in requests:
+            journal.append(req.task)
+        journal.close()
+        run = analyze.load(path)
+        self.assertEqual(list(run['status']), [req.task.status for req in requests])
+        self.assertTrue(numpy.allclose(run['duration'], [req.task.duration for req in requests], atol=1e-6))
+        stats = analyze.function_stats(run)
+        self.assertEqual([s['count'] for s in stats.values()], [4])
+        self.assertEqual(list(stats.values())[0]['failure_rate'], 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import unittest
+import os
 import time
 from pykron.core import Pykron, PykronLogger, Task
 from pykron.test import PykronTest
@@ -148,5 +149,68 @@ class TestBasic(PykronTest):
         for i in range(0, len(retvals)):
             self.assertEqual(retvals[i], args[i])
 
+    def test_lazy_start(self):
+        ''' tests that decorating a function does not start the runtime and
+        that the first request does
+        '''
+        app = Pykron.getInstance()
+
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return 1
+
+        self.assertFalse(app.running)
+        request = inner_fun()
+        self.assertTrue(app.running)
+        request.wait_for_completed()
+        self.assertEqual(request.task.retval, 1)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "os.fork is not available")
+    def test_fork(self):
+        ''' tests that requests can be run in a forked child
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return x + 1
+
+        self.assertEqual(inner_fun(1).wait_for_completed(), 2)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                code = 0 if Pykron.join([inner_fun(i) for i in range(3)]) == [1, 2, 3] else 1
+            except BaseException:
+                code = 2
+            os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertEqual(inner_fun(2).wait_for_completed(), 3)
+
+    def test_current_task(self):
+        ''' tests that the current task follows the request and that children
+        record the id of their parent task
+        '''
+        @Pykron.AsyncRequest()
+        def inner_child():
+            return Pykron.current_task()
+
+        @Pykron.AsyncRequest()
+        def inner_parent():
+            return Pykron.current_task(), inner_child().wait_for_completed()
+
+        self.assertIsNone(Pykron.current_task())
+        request = inner_parent()
+        parent, child = request.wait_for_completed()
+        self.assertIs(parent, request.task)
+        self.assertIsNone(parent.parent_id)
+        self.assertEqual(child.parent_id, parent.task_id)
+
+    def test_current_task_coroutine(self):
+        @Pykron.AsyncRequest()
+        async def inner_fun():
+            yield Pykron.current_task()
+
+        request = inner_fun()
+        self.assertEqual(list(request), [request.task])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import pykron
+from pykron.core import Pykron, Task
+from pykron.test import PykronVirtualTest
+
+REAL_TIMEOUT = 5.0
+
+class TestVirtualClock(PykronVirtualTest):
+
+    def test_timeout(self):
+        ''' tests that the timeout fires exactly when the clock reaches the
+        deadline
+        '''
+        @Pykron.AsyncRequest(timeout=1.0)
+        def inner_fun():
+            pykron.sleep(10.0)
+
+        request = inner_fun()
+        self.assertTrue(self.clock.wait_sleepers(1, REAL_TIMEOUT))
+        self.clock.advance(0.999)
+        self.assertFalse(request.completed.is_set())
+        self.clock.advance(0.001)
+        self.assertTrue(request.completed.wait(REAL_TIMEOUT))
+        self.assertEqual(request.task.status, Task.TIMEOUT)
+        self.assertEqual(request.task.duration, 1.0)
+
+    def test_sleep_order(self):
+        @Pykron.AsyncRequest()
+        def inner_fun(delay):
+            pykron.sleep(delay)
+            return Pykron.getInstance().clock.now()
+
+        requests = [inner_fun(3.0), inner_fun(1.0), inner_fun(2.0)]
+        self.assertTrue(self.clock.wait_sleepers(3, REAL_TIMEOUT))
+        for step, i in enumerate((1, 2, 0)):
+            self.clock.advance(1.0)
+            self.assertTrue(requests[i].completed.wait(REAL_TIMEOUT))
+            self.assertEqual(sum(r.completed.is_set() for r in requests), step + 1)
+        self.assertEqual([r.task.retval for r in requests], [3.0, 1.0, 2.0])
+
+    def test_wait_for_completed_timeout(self):
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            pykron.sleep(10.0)
+
+        def advance():
+            self.clock.wait_sleepers(2, REAL_TIMEOUT)
+            self.clock.advance(2.0)
+
+        request = inner_fun()
+        threading.Thread(target=advance).start()
+        self.assertIsNone(request.wait_for_completed(2.0))
+        self.assertEqual(request.task.status, Task.TIMEOUT)
+        self.assertEqual(self.clock.now(), 2.0)
+
+    def test_deadline_propagation(self):
+        ''' tests that a child inherits the virtual deadline of its parent
+        '''
+        @Pykron.AsyncRequest(timeout=10.0)
+        def inner_child():
+            return Pykron.remaining_time()
+
+        @Pykron.AsyncRequest(timeout=3.0)
+        def inner_parent():
+            pykron.sleep(1.0)
+            return inner_child().wait_for_completed()
+
+        request = inner_parent()
+        self.assertTrue(self.clock.wait_sleepers(1, REAL_TIMEOUT))
+        self.clock.advance(1.0)
+        self.assertTrue(request.completed.wait(REAL_TIMEOUT))
+        self.assertEqual(request.task.retval, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import time
+from pykron.core import Pykron, Task
+from pykron.dag import PykronDAG
+from pykron.test import PykronTest
+
+
+class TestContinuation(PykronTest):
+
+    def test_then(self):
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            time.sleep(0.1)
+            return x
+
+        req = inner_fun(1).then(lambda x: x + 1).then(lambda x: x * 10)
+        self.assertEqual(req.wait_for_completed(), 20)
+        self.assertEqual(req.task.status, Task.SUCCEED)
+
+    def test_then_failed(self):
+        ''' tests that a continuation of a failed request is never dispatched
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return 1/0
+
+        req = inner_fun().then(lambda x: x + 1)
+        self.assertIsNone(req.wait_for_completed())
+        self.assertEqual(req.task.status, Task.CANCELLED)
+
+    def test_all(self):
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            time.sleep(0.1)
+            return x
+
+        req = Pykron.all([inner_fun(i) for i in range(5)]).then(sum)
+        self.assertEqual(req.wait_for_completed(), 10)
+
+    def test_map(self):
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return x
+
+        group = Pykron.all([inner_fun(i) for i in range(3)]).map(lambda x: x * 2)
+        self.assertEqual(group.wait_for_completed(), [0, 2, 4])
+
+    def test_dag(self):
+        dag = PykronDAG()
+        dag.add('a', lambda: 1)
+        dag.add('b', lambda: 2)
+        dag.add('c', lambda a, b: a + b, deps=['a', 'b'])
+
+        @dag.node('d', deps=['c', 'a'])
+        def d(c, a):
+            return c * 10 + a
+
+        requests = dag.run()
+        self.assertEqual(requests['d'].wait_for_completed(), 31)
+        self.assertRaises(ValueError, dag.add, 'e', sum, deps=['x'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import gc
+import weakref
+from pykron.core import Pykron, Task
+from pykron.test import PykronTest
+
+class Payload:
+    pass
+
+class TestHistory(PykronTest):
+
+    def setUp(self):
+        Pykron(history_size=3)
+        super().setUp()
+
+    def test_history(self):
+        ''' tests that only the most recent completed tasks are kept
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return x
+
+        requests = []
+        for i in range(5):
+            req = inner_fun(i)
+            req.wait_for_completed()
+            requests.append(req)
+        history = Pykron.getInstance().history
+        self.assertEqual([t.task_id for t in history], [req.task.task_id for req in requests[2:]])
+        self.assertEqual(history[-1].status, Task.SUCCEED)
+
+    def test_payload_released(self):
+        ''' tests that the history does not keep the arguments and the return
+        value of a task alive
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun(payload):
+            return Payload()
+
+        payload = Payload()
+        request = inner_fun(payload)
+        refs = [weakref.ref(payload), weakref.ref(request.wait_for_completed())]
+        del payload, request
+        gc.collect()
+        self.assertEqual(len(Pykron.getInstance().history), 1)
+        self.assertEqual([ref() for ref in refs], [None, None])
+
+    def test_caller_frame_released(self):
+        ''' tests that a task does not keep the locals of its caller alive
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return 1
+
+        def caller():
+            payload = Payload()
+            request = inner_fun()
+            request.wait_for_completed()
+            return weakref.ref(payload), request
+
+        ref, request = caller()
+        self.assertEqual(request.task.caller_name, 'caller')
+        self.assertIsNone(ref())
+
+    def test_failed_frame_released(self):
+        ''' tests that the locals of a failed task are released
+        '''
+        refs = []
+
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            payload = Payload()
+            refs.append(weakref.ref(payload))
+            return 1/0
+
+        request = inner_fun()
+        request.wait_for_completed()
+        self.assertEqual(request.task.status, Task.FAILED)
+        self.assertIsNone(refs[0]())
+
+    def test_task_released(self):
+        ''' tests that nothing but the history keeps a completed task alive
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return 1
+
+        request = inner_fun()
+        request.wait_for_completed()
+        ref = weakref.ref(request.task)
+        del request
+        for i in range(3):
+            inner_fun().wait_for_completed()
+        gc.collect()
+        self.assertIsNone(ref())
+
+if __name__ == '__main__':
+    unittest.main()
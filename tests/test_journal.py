@@ -0,0 +1,134 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import os
+import tempfile
+from pykron.core import Pykron, Task
+from pykron.journal import HEADER, MAGIC, JournalReader, PykronJournal
+from pykron.test import PykronTest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestJournal(PykronTest):
+
+    def setUp(self):
+        super().setUp()
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, 'run.pkj')
+
+    def tearDown(self):
+        super().tearDown()
+        self._tmpdir.cleanup()
+
+    def record(self, n):
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return 1/x
+
+        requests = [inner_fun(i) for i in range(n)]
+        Pykron.join(requests)
+        journal = PykronJournal(self.path)
+        for req in requests:
+            journal.append(req.task)
+        journal.close()
+        return requests
+
+    def test_roundtrip(self):
+        requests = self.record(3)
+        reader = JournalReader(self.path)
+        records = list(reader)
+        self.assertEqual(len(reader), 3)
+        self.assertEqual(records[0]['status'], Task.FAILED)
+        self.assertEqual(records[1]['status'], Task.SUCCEED)
+        self.assertEqual(records[1]['func_name'], 'inner_fun')
+        self.assertEqual(records[2]['task_id'], requests[2].task.task_id)
+        self.assertAlmostEqual(records[2]['duration'], requests[2].task.duration, places=6)
+        self.assertEqual(reader.strings.count('inner_fun'), 1)
+        reader.close()
+
+    def test_append(self):
+        ''' tests that reopening a journal appends and keeps the interned ids
+        '''
+        self.record(2)
+        self.record(2)
+        reader = JournalReader(self.path)
+        self.assertEqual(len(reader), 4)
+        self.assertEqual(reader.strings.count('inner_fun'), 1)
+        reader.close()
+
+    def test_old_version(self):
+        ''' tests that a journal with another header is moved aside instead
+        of being appended to
+        '''
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, 1, 96) + bytes(96))
+        with open(self.path + '.strings', 'w') as f:
+            f.write('"old_fun"\n')
+        self.record(2)
+        reader = JournalReader(self.path)
+        self.assertEqual(len(reader), 2)
+        self.assertEqual(reader.strings.count('old_fun'), 0)
+        reader.close()
+        self.assertEqual(os.path.getsize(self.path + '.1'), HEADER.size + 96)
+        self.assertEqual(JournalReader.read_strings(self.path + '.1'), ['old_fun'])
+
+    def test_truncated_record(self):
+        ''' tests that a truncated record left by a crash is dropped before
+        appending
+        '''
+        self.record(1)
+        with open(self.path, 'ab') as f:
+            f.write(bytes(10))
+        self.record(1)
+        reader = JournalReader(self.path)
+        self.assertEqual(len(reader), 2)
+        self.assertEqual([r['func_name'] for r in reader], ['inner_fun'] * 2)
+        reader.close()
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        self.record(3)
+        reader = JournalReader(self.path)
+        arr = reader.to_numpy()
+        self.assertEqual(len(arr), 3)
+        self.assertTrue((arr['duration'] >= 0).all())
+        self.assertEqual(reader.strings[arr['func_name'][0]], 'inner_fun')
+        del arr
+        reader.close()
+
+if __name__ == '__main__':
+    unittest.main()
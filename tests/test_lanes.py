@@ -0,0 +1,153 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import time
+from pykron.core import Pykron, PykronPool, Task
+from pykron.lanes import PykronLanes
+from pykron.test import PykronTest
+
+
+class TestLanes(PykronTest):
+
+    def test_serial_per_key(self):
+        ''' tests that requests with the same key run one at a time in
+        submission order on the same thread, and different keys in parallel
+        '''
+        lock = threading.Lock()
+        running = {}
+        overlaps = []
+        order = []
+
+        @Pykron.AsyncRequest(key=lambda args: args[0])
+        def move(motor, step):
+            with lock:
+                running[motor] = running.get(motor, 0) + 1
+                overlaps.append(running[motor] > 1)
+                order.append((motor, step, threading.current_thread().ident))
+            time.sleep(0.02)
+            with lock:
+                running[motor] -= 1
+
+        start = time.perf_counter()
+        Pykron.join([move(motor, step) for step in range(5) for motor in ('left', 'right')])
+        elapsed = time.perf_counter() - start
+        self.assertFalse(any(overlaps))
+        for motor in ('left', 'right'):
+            steps = [(step, ident) for m, step, ident in order if m == motor]
+            self.assertEqual([step for step, ident in steps], list(range(5)))
+            self.assertEqual(len(set(ident for step, ident in steps)), 1)
+        # two lanes of five 20ms steps
+        self.assertLess(elapsed, 0.18)
+        self.assertEqual(sorted(Pykron.getInstance().lanes.keys), ['left', 'right'])
+
+    def test_timeout(self):
+        ''' tests that a request timing out on a lane does not stop the lane
+        '''
+        @Pykron.AsyncRequest(timeout=0.1, key=lambda args: 'camera')
+        def grab(delay):
+            time.sleep(delay)
+            return delay
+
+        slow = grab(1.0)
+        slow.wait_for_completed()
+        self.assertEqual(slow.task.status, Task.TIMEOUT)
+        self.assertEqual(grab(0.01).wait_for_completed(), 0.01)
+
+    def test_late_exception(self):
+        ''' tests that a lane survives an exception raised outside of a work
+        item, as a late Pykron.stop_thread does
+        '''
+        class Late:
+            def run(self):
+                raise TimeoutError()
+
+        lane = Pykron.getInstance().lanes.executor('camera')
+        self.assertTrue(lane.submit(lambda: True).result(timeout=1.0))
+        with lane._work:
+            lane._queue.append(Late())
+            lane._work.notify()
+        self.assertTrue(lane.submit(lambda: True).result(timeout=1.0))
+
+    def test_retire(self):
+        ''' tests that an idle lane retires its thread and that a submit to
+        a retired lane goes to a new lane of the key
+        '''
+        lanes = PykronLanes(keepalive=0.05)
+        lane = lanes.executor('connection')
+        thread = lane.submit(threading.current_thread).result(timeout=1.0)
+        thread.join(1.0)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(lanes.keys, [])
+        self.assertTrue(lane.submit(lambda: True).result(timeout=1.0))
+        self.assertIsNot(lanes.executor('connection'), lane)
+        lanes.shutdown(wait=True)
+
+    def test_same_lane_wait(self):
+        ''' tests that waiting for a request queued on the lane of the caller
+        fails instead of blocking the lane forever
+        '''
+        @Pykron.AsyncRequest(key=lambda args: 'motor')
+        def inner_fun():
+            return True
+
+        @Pykron.AsyncRequest(key=lambda args: 'motor')
+        def outer_fun():
+            return inner_fun().wait_for_completed()
+
+        req = outer_fun()
+        req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.FAILED)
+        self.assertIn('same lane', req.task.exception)
+
+    def test_pool(self):
+        ''' tests that keyed requests do not take pool workers
+        '''
+        Pykron.close()
+        Pykron(pool=PykronPool(min_workers=1, max_workers=1))
+
+        @Pykron.AsyncRequest(key=lambda args: args[0])
+        def keyed(key):
+            time.sleep(0.1)
+
+        @Pykron.AsyncRequest()
+        def unkeyed():
+            return True
+
+        requests = [keyed(i) for i in range(3)]
+        self.assertTrue(unkeyed().wait_for_completed(timeout=0.05))
+        Pykron.join(requests)
+        self.assertEqual(Pykron.getInstance().pool.workers, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import io
+import logging
+from pykron.core import Pykron
+from pykron.logging import PykronLogger, PykronLogSampler, PykronRepr
+from pykron.test import PykronTest
+
+
+class FakeArray:
+
+    shape = (480, 640, 3)
+    dtype = 'uint8'
+
+class TestLogging(PykronTest):
+
+    def test_repr_summary(self):
+        r = PykronRepr(maxlength=64)
+        self.assertEqual(r.repr(FakeArray()), "<FakeArray shape=(480, 640, 3) dtype=uint8>")
+        self.assertEqual(r.repr(b'x' * 1000), "<bytes len=1000>")
+        self.assertEqual(r.repr('test'), 'test')
+        self.assertLessEqual(len(r.repr(list(range(10000)))), 64)
+        self.assertLessEqual(len(r.repr({i: 'x' * 1000 for i in range(100)})), 64)
+
+    def test_lazy_repr(self):
+        ''' tests that lazy records keep immutable scalars until they are
+        written, and a bounded snapshot of anything else
+        '''
+        logger = PykronLogger(logging.DEBUG, Pykron.FORMAT, save_csv=True, lazy_repr=True)
+        logger.close()
+
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            return x
+
+        payload = [1, 2]
+        requests = [inner_fun(x) for x in (42, FakeArray(), payload)]
+        Pykron.join(requests)
+        for req in requests:
+            logger.log_execution(req.task)
+        payload.append(3)
+        scalar, array, mutable = logger._executions
+        self.assertEqual(scalar[11], 42)
+        self.assertEqual(scalar[13], (42,))
+        self.assertEqual(array[11], "<FakeArray shape=(480, 640, 3) dtype=uint8>")
+        self.assertEqual(logger.format_execution(mutable)[11], "[1, 2]")
+        self.assertEqual(logger.format_execution(scalar)[11], "42")
+
+    def test_queue_pipeline(self):
+        ''' tests that records reach the handlers through the listener thread
+        and that a full queue drops records instead of blocking
+        '''
+        stream = io.StringIO()
+        logger = PykronLogger(logging.DEBUG, '%(message)s', queue_size=4)
+        logger.addStreamHandler(stream)
+        for i in range(1000):
+            logger.log.debug("record %d", i)
+        logger.close()
+        lines = stream.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("record"))
+        self.assertEqual(len([l for l in lines if l.startswith("record")]) + logger.dropped, 1000)
+
+    def test_sampling(self):
+        ''' tests that only the first executions of a function are logged and
+        that the others are reported in the summary
+        '''
+        stream = io.StringIO()
+        logger = PykronLogger(logging.DEBUG, '%(message)s', sampler=PykronLogSampler(every=10, first=3, interval=60.0))
+        logger.addStreamHandler(stream)
+
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            pass
+
+        sampled = []
+        for i in range(20):
+            req = inner_fun()
+            req.wait_for_completed()
+            sampled.append(logger.sample(req.task))
+            logger.log_execution(req.task)
+        logger.close()
+        self.assertEqual(sampled.count(True), 5)
+        self.assertTrue(all(sampled[:3]))
+        summary = [l for l in stream.getvalue().splitlines() if l.startswith('inner_fun:')]
+        self.assertEqual(len(summary), 1)
+        self.assertTrue(summary[0].startswith("inner_fun: 20 runs"))
+        self.assertIn("0 failures, 15 suppressed", summary[0])
+
+    def test_sampling_disabled_level(self):
+        logger = PykronLogger(logging.INFO, '%(message)s', sampler=PykronLogSampler(first=100))
+        logger.close()
+
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            pass
+
+        req = inner_fun()
+        req.wait_for_completed()
+        self.assertFalse(logger.sample(req.task))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import time
+from pykron.core import Pykron, Task
+from pykron.test import PykronTest
+
+def inverse(x):
+    return 1/x
+
+class TestMap(PykronTest):
+
+    def test_ordered(self):
+        result = Pykron.map(inverse, range(1, 101), chunksize=8)
+        self.assertEqual(list(result), [1/x for x in range(1, 101)])
+        self.assertEqual(len(result.chunks), 13)
+        self.assertEqual(result.statuses, [Task.SUCCEED] * 100)
+
+    def test_failures(self):
+        ''' tests that a failing item does not affect the others of its chunk
+        '''
+        result = Pykron.map(inverse, range(-2, 3), chunksize=2)
+        self.assertEqual(result.wait_for_completed(), [-0.5, -1.0, None, 1.0, 0.5])
+        self.assertEqual(result.statuses[2], Task.FAILED)
+        self.assertEqual(list(result.failures), [2])
+        self.assertIn('ZeroDivisionError', result.failures[2])
+
+    def test_unordered(self):
+        def sleep(x):
+            time.sleep(x)
+            return x
+
+        result = Pykron.map(sleep, [0.3, 0.0], chunksize=1, ordered=False)
+        self.assertEqual(list(result), [0.0, 0.3])
+
+    def test_chunk_timeout(self):
+        ''' tests that a chunk stops running its items once timed out
+        '''
+        executed = []
+
+        def sleep(x):
+            executed.append(x)
+            time.sleep(x)
+            return x
+
+        result = Pykron.map(sleep, [0.0, 0.5, 0.0], chunksize=2, timeout=0.2)
+        self.assertEqual(list(result), [None, None, 0.0])
+        self.assertEqual(result.statuses[:2], [Task.TIMEOUT, Task.TIMEOUT])
+        executed.clear()
+        result = Pykron.map(sleep, [0.5, 0.3, 0.3, 0.3], chunksize=4, timeout=0.2)
+        self.assertEqual(list(result), [None] * 4)
+        self.assertEqual(result.statuses, [Task.TIMEOUT] * 4)
+        time.sleep(0.5)
+        self.assertEqual(executed, [0.5])
+
+    def test_inflight(self):
+        ''' tests that the iterable is consumed as the chunks complete, with at
+        most inflight chunks running
+        '''
+        lock = threading.Lock()
+        gate = threading.Event()
+        consumed = []
+        running = [0, 0]
+
+        def items():
+            for i in range(40):
+                consumed.append(i)
+                yield i
+
+        def work(x):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            gate.wait(1.0)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return x
+
+        result = Pykron.map(work, items(), chunksize=2, inflight=3)
+        self.assertEqual(len(consumed), 6)
+        gate.set()
+        self.assertEqual(sorted(result), list(range(40)))
+        self.assertLessEqual(running[1], 3)
+        self.assertEqual(len(result.chunks), 20)
+        result = Pykron.map(work, items(), chunksize=2, inflight=3, ordered=False)
+        self.assertEqual(sorted(result), list(range(40)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import os
+import tempfile
+import threading
+from pykron.core import Pykron
+from pykron.monitor import read_snapshot
+from pykron.test import PykronTest
+from pykron import top
+
+class TestMonitor(PykronTest):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, 'pykron.sock')
+        Pykron(monitor=self.path)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.assertFalse(os.path.exists(self.path))
+        self._tmpdir.cleanup()
+
+    def test_snapshot(self):
+        ''' tests that a snapshot read through the socket lists the running
+        tasks with their parent
+        '''
+        release = threading.Event()
+
+        @Pykron.AsyncRequest()
+        def inner_child():
+            release.wait()
+
+        @Pykron.AsyncRequest()
+        def inner_parent():
+            child = inner_child()
+            child.task.started.wait()
+            started.set()
+            child.wait_for_completed()
+
+        started = threading.Event()
+        request = inner_parent()
+        started.wait()
+        snapshot = read_snapshot(self.path)
+        release.set()
+        request.wait_for_completed()
+        tasks = {t['func_name']: t for t in snapshot['tasks']}
+        self.assertEqual(snapshot['pid'], os.getpid())
+        self.assertEqual(tasks['inner_child']['parent_id'], tasks['inner_parent']['task_id'])
+        self.assertEqual(tasks['inner_child']['status'], 'RUNNING')
+        self.assertEqual(snapshot['timers'], 2)
+        self.assertIn('inner_child', top.render(snapshot))
+        self.assertEqual(Pykron.getInstance().snapshot()['completed'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
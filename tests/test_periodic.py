@@ -0,0 +1,95 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import time
+from pykron.core import Pykron, Task
+from pykron.periodic import Histogram
+from pykron.test import PykronTest
+
+
+class TestPeriodic(PykronTest):
+
+    def test_histogram(self):
+        hist = Histogram()
+        for i in range(1, 101):
+            hist.record(i / 1000.0)
+        self.assertEqual(hist.count, 100)
+        self.assertAlmostEqual(hist.percentile(50), 0.05, delta=0.01)
+        self.assertEqual(hist.percentile(100), 0.1)
+
+    def test_no_drift(self):
+        ''' tests that releases follow absolute deadlines
+        '''
+        @Pykron.Periodic(period=0.01, overrun='catch_up', iterations=50)
+        def tick():
+            time.sleep(0.002)
+
+        req = tick()
+        stats = req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.SUCCEED)
+        self.assertEqual(stats.iterations, 50)
+        self.assertEqual(stats.jitter.count, 50)
+        self.assertLess(req.task.duration, 0.55)
+
+    def test_overrun_skip(self):
+        @Pykron.Periodic(period=0.01, overrun='skip', iterations=5)
+        def tick():
+            time.sleep(0.025)
+
+        stats = tick().wait_for_completed()
+        self.assertEqual(stats.overruns, 5)
+        self.assertGreaterEqual(stats.skipped, 10)
+
+    def test_overrun_catch_up(self):
+        @Pykron.Periodic(period=0.01, overrun='catch_up', iterations=5)
+        def tick():
+            time.sleep(0.025)
+
+        stats = tick().wait_for_completed()
+        self.assertEqual(stats.overruns, 5)
+        self.assertEqual(stats.skipped, 0)
+
+    def test_stop(self):
+        @Pykron.Periodic(period=0.01)
+        def tick():
+            pass
+
+        req = tick()
+        time.sleep(0.1)
+        req.stop()
+        stats = req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.SUCCEED)
+        self.assertGreater(stats.iterations, 0)
+
+if __name__ == '__main__':
+    unittest.main()
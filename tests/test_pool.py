@@ -0,0 +1,127 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import time
+from pykron.core import Pykron, PykronPool, Task
+from pykron.pool import available_cpus
+from pykron.test import PykronTest
+
+
+class TestPool(PykronTest):
+
+    def test_available_cpus(self):
+        self.assertGreaterEqual(available_cpus(), 1)
+
+    def test_grow_and_shrink(self):
+        ''' tests that the pool grows up to max_workers under load and
+        shrinks back to min_workers once idle
+        '''
+        pool = PykronPool(min_workers=1, max_workers=4, keepalive=0.2)
+        futures = [pool.submit(time.sleep, 0.2) for i in range(8)]
+        time.sleep(0.1)
+        self.assertEqual(pool.workers, 4)
+        for f in futures:
+            f.result()
+        time.sleep(0.5)
+        self.assertEqual(pool.workers, 1)
+        pool.shutdown()
+
+    def test_blocked_compensation(self):
+        ''' tests that nested requests complete on a single-thread pool
+        '''
+        Pykron.close()
+        Pykron(pool=PykronPool(min_workers=1, max_workers=1))
+
+        @Pykron.AsyncRequest()
+        def child(x):
+            return x
+
+        @Pykron.AsyncRequest()
+        def parent():
+            return sum(Pykron.join([child(i) for i in range(4)]))
+
+        req = parent()
+        self.assertEqual(req.wait_for_completed(), 6)
+        self.assertEqual(req.task.status, Task.SUCCEED)
+
+    def test_help_while_waiting(self):
+        ''' tests that a worker waiting on queued children runs them inline
+        '''
+        pool = PykronPool(min_workers=1, max_workers=1)
+        Pykron.close()
+        Pykron(pool=pool)
+
+        @Pykron.AsyncRequest()
+        def child():
+            return threading.get_ident()
+
+        @Pykron.AsyncRequest()
+        def parent():
+            children = [child() for i in range(8)]
+            return threading.get_ident(), Pykron.join(children)
+
+        ident, idents = parent().wait_for_completed()
+        self.assertEqual(set(idents), {ident})
+        self.assertEqual(pool.workers, 1)
+
+    def test_inline_timeout(self):
+        ''' tests that a parent timing out while its child runs inline stops
+        once the child returns
+        '''
+        pool = PykronPool(min_workers=1, max_workers=1)
+        Pykron.close()
+        Pykron(pool=pool)
+        resumed = []
+
+        @Pykron.AsyncRequest()
+        def child():
+            end = time.perf_counter() + 0.6
+            while time.perf_counter() < end:
+                pass
+            return True
+
+        @Pykron.AsyncRequest(timeout=0.3, cancel_propagation=False)
+        def parent():
+            req = child()
+            req.wait_for_completed()
+            resumed.append(req)
+
+        req = parent()
+        req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.TIMEOUT)
+        time.sleep(0.8)
+        self.assertEqual(resumed, [])
+
+if __name__ == '__main__':
+    unittest.main()
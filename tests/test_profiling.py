@@ -0,0 +1,103 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+from pykron.core import Pykron
+from pykron.test import PykronTest
+
+LEAKED = []
+
+
+class TestMemoryProfiling(PykronTest):
+
+    def setUp(self):
+        Pykron(memory_profiling=True)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        LEAKED.clear()
+
+    def test_task_memory(self):
+        ''' tests that a task keeping its allocations has them as net bytes,
+        while a task releasing them only has a peak
+        '''
+        @Pykron.AsyncRequest()
+        def leak_fun():
+            LEAKED.append(bytearray(1000000))
+
+        @Pykron.AsyncRequest()
+        def temp_fun():
+            buffer = bytearray(1000000)
+            del buffer
+
+        leak = leak_fun()
+        leak.wait_for_completed()
+        temp = temp_fun()
+        temp.wait_for_completed()
+        self.assertGreaterEqual(leak.task.allocated, 1000000)
+        self.assertGreaterEqual(leak.task.peak_allocated, 1000000)
+        self.assertLess(temp.task.allocated, 100000)
+        self.assertGreaterEqual(temp.task.peak_allocated, 1000000)
+
+    def test_statistics(self):
+        ''' tests that the memory still allocated is attributed to the function
+        that allocated it, with concurrent tasks
+        '''
+        @Pykron.AsyncRequest()
+        def leak_fun(n):
+            LEAKED.append(bytearray(n))
+
+        Pykron.join([leak_fun(100000) for i in range(10)])
+        functions, sites = Pykron.getInstance().memory_profiler.statistics()
+        self.assertEqual(functions['leak_fun']['tasks'], 10)
+        self.assertGreaterEqual(functions['leak_fun']['live'], 1000000)
+        self.assertIn(__file__, sites[0][0])
+
+    def test_map_attribution(self):
+        ''' tests that the memory of mapped functions is attributed to each
+        function rather than to the map runner
+        '''
+        def alloc_a(n):
+            LEAKED.append(bytearray(n))
+
+        def alloc_b(n):
+            LEAKED.append(bytearray(n))
+
+        list(Pykron.map(alloc_a, [100000] * 4, chunksize=2))
+        list(Pykron.map(alloc_b, [100000] * 4, chunksize=2))
+        functions, sites = Pykron.getInstance().memory_profiler.statistics()
+        self.assertGreaterEqual(functions['alloc_a']['live'], 400000)
+        self.assertGreaterEqual(functions['alloc_b']['live'], 400000)
+
+if __name__ == '__main__':
+    unittest.main()
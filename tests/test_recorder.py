@@ -0,0 +1,157 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from pykron.core import Pykron
+from pykron.recorder import EVENTS, FlightRecorder
+from pykron.test import PykronTest
+
+
+class TestFlightRecorder(PykronTest):
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, 'flight.log')
+        Pykron(flight_recorder=FlightRecorder(path=self.path))
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self._tmpdir.cleanup()
+
+    def events(self):
+        return [(EVENTS[event], task_id) for stamp, thread, event, task_id, arg in Pykron.getInstance().flight_recorder.events()]
+
+    def test_propagation(self):
+        ''' tests that the failure of a child and the cancellation of its
+        parent are recorded in order, and dumped
+        '''
+        @Pykron.AsyncRequest()
+        def child():
+            return 1/0
+
+        @Pykron.AsyncRequest()
+        def parent():
+            child().wait_for_completed()
+            time.sleep(1)
+
+        req = parent()
+        req.wait_for_completed()
+        Pykron.getInstance().flight_recorder.flush()
+        parent_id = req.task.task_id
+        child_id = parent_id + 1
+        events = self.events()
+        self.assertEqual(events[0], ('SUBMIT', parent_id))
+        order = [events.index(e) for e in [('START', child_id), ('FINISH', child_id), ('PROPAGATE', child_id), ('CANCEL', parent_id), ('FINISH', parent_id)]]
+        self.assertEqual(order, sorted(order))
+        with open(self.path) as f:
+            dump = f.read()
+        self.assertIn("T%d FAILED" % child_id, dump)
+        self.assertIn("PROPAGATE T%d -> T%d" % (child_id, parent_id), Pykron.getInstance().flight_recorder.format('test'))
+
+    def test_dump_interval(self):
+        ''' tests that failures dump at most once per DUMP_INTERVAL
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return 1/0
+
+        Pykron.join([inner_fun() for i in range(3)])
+        self.assertEqual(Pykron.getInstance().flight_recorder.dumps, 1)
+
+    def test_backups(self):
+        ''' tests that each dump replaces the file and that only the last
+        backups dumps are kept, written by the writer thread
+        '''
+        recorder = FlightRecorder(path=self.path, signum=None, backups=1)
+        for i in range(3):
+            recorder.record(0, i)
+            recorder.dump("dump %d" % i)
+        recorder.flush()
+        self.assertEqual(recorder._writer.name, "PykronFlightRecorder")
+        recorder.close()
+        with open(self.path) as f:
+            self.assertIn("dump 2", f.read())
+        with open(self.path + '.1') as f:
+            self.assertIn("dump 1", f.read())
+        self.assertEqual(sorted(os.listdir(self._tmpdir.name)), ['flight.log', 'flight.log.1'])
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1'), "SIGUSR1 is not available")
+    def test_signal(self):
+        recorder = Pykron.getInstance().flight_recorder
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertEqual(recorder.dumps, 1)
+
+    def test_hooks(self):
+        ''' tests that the global hooks are only installed on request and
+        restored on close
+        '''
+        Pykron.close()
+        excepthook = sys.excepthook
+        Pykron()
+        self.assertIsNone(Pykron.getInstance().flight_recorder)
+        self.assertIs(sys.excepthook, excepthook)
+        recorder = FlightRecorder(path=self.path, signum=None, hooks=False)
+        self.assertIs(sys.excepthook, excepthook)
+        recorder.close()
+        Pykron.close()
+        Pykron(flight_recorder=FlightRecorder(path=self.path, signum=None))
+        self.assertIsNot(sys.excepthook, excepthook)
+        Pykron.close()
+        self.assertIs(sys.excepthook, excepthook)
+
+    def test_ring(self):
+        ''' tests that a ring keeps the most recent events and is reused once
+        its thread is finished
+        '''
+        recorder = FlightRecorder(size=4, path=self.path, signum=None)
+        for i in range(10):
+            recorder.record(0, i)
+        self.assertEqual([e[3] for e in recorder.events()], [6, 7, 8, 9])
+        thread = threading.Thread(target=recorder.record, args=(1, 10))
+        thread.start()
+        thread.join()
+        thread = threading.Thread(target=recorder.record, args=(1, 11))
+        thread.start()
+        thread.join()
+        self.assertEqual([e[3] for e in recorder.events()], [6, 7, 8, 9, 10, 11])
+        self.assertEqual(len(recorder._rings), 2)
+        recorder.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import os
+import tempfile
+from pykron.core import Pykron, Task
+from pykron.journal import PykronJournal
+from pykron.replay import Record, Replay, Workload, load, summary
+from pykron.test import PykronTest
+
+
+class TestReplay(PykronTest):
+
+    def setUp(self):
+        super().setUp()
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        super().tearDown()
+        self._tmpdir.cleanup()
+
+    def test_workload(self):
+        ''' tests that children are attached to the recorded parents and that
+        tasks whose parent was not recorded are replayed as roots
+        '''
+        records = [Record(1, None, 'root', 0.0, 0.0, 0.1, 'SUCCEED'),
+                   Record(2, 1, 'child', 0.05, 0.05, 0.01, 'SUCCEED'),
+                   Record(3, 99, 'orphan', 0.2, 0.2, 0.01, 'SUCCEED')]
+        workload = Workload(records)
+        self.assertEqual(len(workload), 3)
+        self.assertEqual([r.task_id for r in workload.roots], [1, 3])
+        self.assertEqual([r.task_id for r in workload.children(records[0])], [2])
+
+    def test_replay(self):
+        ''' tests that the replay spawns children from their parents, keeps the
+        arrival pattern and reproduces failures and timeouts
+        '''
+        records = [Record(1, None, 'root', 10.0, 10.0, 0.1, 'SUCCEED'),
+                   Record(2, 1, 'child', 10.05, 10.05, 0.01, 'SUCCEED'),
+                   Record(3, None, 'bad', 10.2, 10.2, 0.01, 'FAILED'),
+                   Record(4, None, 'slow', 10.3, 10.3, 1.0, 'SUCCEED')]
+        replay = Replay(Workload(records), timeouts={'slow': 0.2})
+        requests = dict((record.task_id, req) for record, req in replay.run())
+        self.assertEqual(requests[2].task.parent_id, requests[1].task.task_id)
+        self.assertAlmostEqual(requests[2].task.arrival_ts - requests[1].task.arrival_ts, 0.05, delta=0.03)
+        self.assertAlmostEqual(requests[3].task.arrival_ts - requests[1].task.arrival_ts, 0.2, delta=0.03)
+        stats = summary(replay.requests)
+        self.assertEqual(stats['root']['statuses'][Task.SUCCEED], 1)
+        self.assertEqual(stats['bad']['statuses'][Task.FAILED], 1)
+        self.assertEqual(stats['slow']['statuses'][Task.TIMEOUT], 1)
+        self.assertGreaterEqual(stats['root']['latency'][50], 0.1)
+
+    def test_load(self):
+        ''' tests that the parent relations are read from a journal
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return Pykron.join([leaf_fun()])
+
+        @Pykron.AsyncRequest()
+        def leaf_fun():
+            return True
+
+        req = inner_fun()
+        req.wait_for_completed()
+        tasks = [t for t in Pykron.getInstance().history]
+        path = os.path.join(self._tmpdir.name, 'run.pkj')
+        journal = PykronJournal(path)
+        for task in tasks:
+            journal.append(task)
+        journal.close()
+        records = load(path)
+        self.assertEqual([r.func_name for r in records], ['inner_fun', 'leaf_fun'])
+        self.assertEqual(records[1].parent_id, records[0].task_id)
+        workload = Workload(records)
+        self.assertEqual(len(workload.roots), 1)
+        self.assertEqual(len(workload.children(records[0])), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import threading
+import time
+import pykron
+from pykron.core import Pykron, Task
+from pykron.test import PykronTest, PykronVirtualTest
+
+def busy(duration):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        time.sleep(0.01)
+
+class TestScope(PykronTest):
+
+    def test_join(self):
+        ''' tests that leaving the scope joins all of its requests
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fun(x):
+            time.sleep(0.1)
+            return x
+
+        with Pykron.scope() as scope:
+            requests = [inner_fun(i) for i in range(3)]
+        self.assertTrue(all(r.completed.is_set() for r in requests))
+        self.assertEqual([r.task.retval for r in requests], [0, 1, 2])
+        self.assertFalse(scope.cancelled)
+        self.assertEqual(scope.pending, 0)
+
+    def test_failure_cancels_subtree(self):
+        ''' tests that a failure cancels the siblings and their children
+        '''
+        children = []
+
+        @Pykron.AsyncRequest()
+        def inner_child():
+            busy(5.0)
+
+        @Pykron.AsyncRequest(cancel_propagation=False)
+        def inner_parent():
+            children.append(inner_child())
+            busy(5.0)
+
+        @Pykron.AsyncRequest()
+        def inner_fail():
+            time.sleep(0.2)
+            return 1/0
+
+        start = time.perf_counter()
+        with self.assertRaises(ZeroDivisionError):
+            with Pykron.scope() as scope:
+                parent = inner_parent()
+                failed = inner_fail()
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertIs(scope.failure, failed)
+        self.assertTrue(scope.cancelled)
+        self.assertEqual(failed.task.status, Task.FAILED)
+        self.assertEqual(parent.task.status, Task.CANCELLED)
+        self.assertEqual(children[0].task.status, Task.CANCELLED)
+
+    def test_failure_raised(self):
+        ''' tests that leaving a scope raises the first failure of its
+        requests once the body completed
+        '''
+        @Pykron.AsyncRequest()
+        def inner_fail():
+            raise ValueError("child")
+
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            return True
+
+        completed = []
+        with self.assertRaises(ValueError):
+            with Pykron.scope() as scope:
+                inner_fail().wait_for_completed()
+                completed.append(inner_fun())
+        self.assertEqual(len(completed), 1)
+        self.assertEqual(scope.failure.task.func_name, 'inner_fail')
+
+        with self.assertRaises(KeyError):
+            with Pykron.scope() as scope:
+                inner_fail().wait_for_completed()
+                raise KeyError()
+
+    def test_cancelled_scope_rejects(self):
+        @Pykron.AsyncRequest()
+        def inner_fun():
+            pass
+
+        with Pykron.scope() as scope:
+            scope.cancel()
+            request = inner_fun()
+        self.assertEqual(request.task.status, Task.CANCELLED)
+
+    def test_continuation_timeout(self):
+        ''' tests that the continuations of the scope, pending or dispatched,
+        end as timed out with the scope
+        '''
+        @Pykron.AsyncRequest()
+        def slow_fun():
+            busy(1.0)
+
+        @Pykron.AsyncRequest()
+        def fast_fun():
+            return True
+
+        def slow_continuation(x):
+            busy(1.0)
+
+        start = time.perf_counter()
+        with Pykron.scope(timeout=0.3) as scope:
+            pending = slow_fun().then(slow_continuation)
+            dispatched = fast_fun().then(slow_continuation)
+            dispatched.task.started.wait(1.0)
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertTrue(scope.timed_out)
+        self.assertEqual(pending.task.status, Task.TIMEOUT)
+        self.assertEqual(dispatched.task.status, Task.TIMEOUT)
+        self.assertLessEqual(dispatched.task.deadline, scope.deadline)
+
+class TestScopeTimeout(PykronVirtualTest):
+
+    def test_timeout(self):
+        ''' tests that the requests of the scope share its deadline
+        '''
+        @Pykron.AsyncRequest(timeout=10.0)
+        def inner_fun():
+            pykron.sleep(5.0)
+
+        def advance():
+            # two tasks and the scope join
+            self.clock.wait_sleepers(3, 5.0)
+            self.clock.advance(1.0)
+
+        threading.Thread(target=advance).start()
+        with Pykron.scope(timeout=1.0) as scope:
+            requests = [inner_fun(), inner_fun()]
+        self.assertEqual(scope.deadline, 1.0)
+        self.assertEqual([r.task.status for r in requests], [Task.TIMEOUT, Task.TIMEOUT])
+        self.assertEqual(self.clock.now(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
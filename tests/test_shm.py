@@ -0,0 +1,153 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import pickle
+import threading
+from pykron.core import Pykron, Task
+from pykron.shm import SegmentPool
+from pykron.test import PykronTest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestSharedMemory(PykronTest):
+
+    def test_segment_reuse(self):
+        pool = SegmentPool()
+        a = pool.allocate(100000)
+        a.release()
+        b = pool.allocate(120000)
+        self.assertEqual(pool.segments, 1)
+        self.assertEqual(len(b), 120000)
+        pool.close()
+
+    def test_pickle_by_name(self):
+        ''' tests that pickling transfers the segment name only
+        '''
+        pool = SegmentPool()
+        shared = pool.share(bytes(range(256)) * 4096)
+        data = pickle.dumps(shared)
+        self.assertLess(len(data), 1024)
+        attached = pickle.loads(data)
+        self.assertEqual(bytes(attached.buf), bytes(shared.buf))
+        attached.release()
+        pool.close()
+
+    def test_task_lifetime(self):
+        ''' tests that the buffers of a task are released on completion
+        except the one returned
+        '''
+        @Pykron.AsyncRequest()
+        def producer():
+            Pykron.allocate_shared(1 << 20)
+            return Pykron.share(b'y' * 1000)
+
+        req = producer()
+        shared = req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.SUCCEED)
+        self.assertIsNone(shared.task_id)
+        self.assertEqual(bytes(shared.buf), b'y' * 1000)
+        self.assertEqual(Pykron.getInstance().shm.cached, 1 << 20)
+        shared.release()
+
+    def test_returned_views(self):
+        ''' tests that buffers reachable from the return value through a
+        container or a view are kept
+        '''
+        @Pykron.AsyncRequest()
+        def producer():
+            shared = Pykron.share(b'x' * 1000)
+            return (shared, {'view': Pykron.share(b'z' * 1000).buf})
+
+        req = producer()
+        shared, meta = req.wait_for_completed()
+        self.assertIsNone(shared.task_id)
+        self.assertEqual(Pykron.getInstance().shm.cached, 0)
+        other = Pykron.allocate_shared(1000)
+        other.buf[:] = b'w' * 1000
+        self.assertEqual(bytes(shared.buf), b'x' * 1000)
+        self.assertEqual(bytes(meta['view']), b'z' * 1000)
+        meta['view'].release()
+        other.release()
+        shared.release()
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_backs(self):
+        ''' tests that a buffer recognizes the arrays and views of its memory
+        '''
+        pool = SegmentPool()
+        shared = pool.share(numpy.arange(100, dtype='f8'))
+        other = pool.allocate(800)
+        arr = shared.as_array('f8', (10, 10))[2:]
+        view = shared.buf[8:]
+        self.assertTrue(shared.backs(shared))
+        self.assertTrue(shared.backs(arr))
+        self.assertTrue(shared.backs(view))
+        self.assertFalse(other.backs(arr))
+        self.assertFalse(shared.backs(other))
+        self.assertFalse(shared.backs(arr.copy()))
+        self.assertFalse(shared.backs(bytes(view)))
+        del arr
+        view.release()
+        pool.close()
+
+    def test_running_child(self):
+        ''' tests that a buffer passed to a child still running is released
+        only when the child completes
+        '''
+        started = threading.Event()
+        resume = threading.Event()
+
+        @Pykron.AsyncRequest()
+        def consumer(shared):
+            started.set()
+            resume.wait(1.0)
+            return bytes(shared.buf)
+
+        @Pykron.AsyncRequest()
+        def producer():
+            req = consumer(Pykron.share(b'c' * 1000))
+            started.wait(1.0)
+            return req
+
+        child = producer().wait_for_completed()
+        self.assertEqual(Pykron.getInstance().shm.cached, 0)
+        resume.set()
+        self.assertEqual(child.wait_for_completed(), b'c' * 1000)
+        self.assertEqual(Pykron.getInstance().shm.cached, Pykron.getInstance().shm.size_class(1000))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import asyncio
+import time
+from pykron.core import Pykron, Task
+from pykron.test import PykronTest
+
+
+class TestStream(PykronTest):
+
+    def test_generator(self):
+        ''' tests that items are delivered while the producer is running and
+        that the producer is paused when the buffer is full
+        '''
+        @Pykron.AsyncRequest(stream_buffer=4)
+        def producer(n):
+            for i in range(n):
+                yield i
+            return n
+
+        req = producer(50)
+        items = []
+        for item in req:
+            self.assertLessEqual(req.task.stream.produced - len(items), 4)
+            items.append(item)
+            time.sleep(0.001)
+        self.assertEqual(items, list(range(50)))
+        self.assertEqual(req.wait_for_completed(), 50)
+        self.assertEqual(req.task.status, Task.SUCCEED)
+
+    def test_async_generator(self):
+        @Pykron.AsyncRequest()
+        async def producer(n):
+            for i in range(n):
+                await asyncio.sleep(0.001)
+                yield i
+
+        self.assertEqual(list(producer(10)), list(range(10)))
+
+    def test_failed_generator(self):
+        @Pykron.AsyncRequest()
+        def producer():
+            yield 1
+            yield 1/0
+
+        req = producer()
+        self.assertEqual(list(req), [1])
+        req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.FAILED)
+
+    def test_abandoned_generator(self):
+        ''' tests that the producer stops when the consumer leaves
+        '''
+        @Pykron.AsyncRequest(stream_buffer=1)
+        def producer():
+            while True:
+                yield 1
+
+        req = producer()
+        for item in req:
+            break
+        req.wait_for_completed()
+        self.assertEqual(req.task.status, Task.SUCCEED)
+
+if __name__ == '__main__':
+    unittest.main()
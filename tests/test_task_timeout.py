@@ -101,3 +101,36 @@ class TestTaskTimeout(PykronTest):
         req = foo2()
         time.sleep(2.0)
         self.assertEqual(req.task.status, Task.SUCCEED)
+
+    def test_deadline_propagation(self):
+        ''' test that a child request inherits the remaining budget of its parent
+        '''
+
+        @Pykron.AsyncRequest(timeout=10.0)
+        def child():
+            return Pykron.remaining_time()
+
+        @Pykron.AsyncRequest(timeout=0.5, cancel_propagation=False)
+        def parent():
+            req = child()
+            req.wait_for_completed()
+            return req
+
+        outer = parent()
+        req = outer.wait_for_completed()
+        self.assertEqual(req.task.status, Task.SUCCEED)
+        self.assertLessEqual(req.task.retval, 0.5)
+        self.assertLessEqual(req.task.deadline, outer.task.deadline)
+
+    def test_deadline_expired(self):
+        ''' test that a request whose deadline already passed is never dispatched
+        '''
+
+        @Pykron.AsyncRequest(timeout=0.0)
+        def inner_fun():
+            return 1
+
+        request = inner_fun()
+        self.assertIsNone(request.wait_for_completed())
+        self.assertEqual(request.task.status, Task.TIMEOUT)
+        self.assertEqual(request.task.duration, 0.0)
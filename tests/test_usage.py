@@ -0,0 +1,110 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2021, Davide De Tommaso (davide.detommaso@iit.it),
+                    Adam Lukomski (adam.lukomski@iit.it),
+                    Social Cognition in Human-Robot Interaction
+                    Istituto Italiano di Tecnologia, Genova
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+import unittest
+import time
+from pykron.core import Pykron, PykronPool, RUSAGE_THREAD
+from pykron.test import PykronTest
+
+def burn(duration):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+class TestUsage(PykronTest):
+
+    def test_cpu_time(self):
+        ''' tests that a busy task is accounted CPU time and a sleeping one
+        is not
+        '''
+        @Pykron.AsyncRequest()
+        def busy_fun():
+            burn(0.2)
+
+        @Pykron.AsyncRequest()
+        def sleep_fun():
+            time.sleep(0.2)
+
+        busy, sleeping = busy_fun(), sleep_fun()
+        Pykron.join([busy, sleeping])
+        self.assertGreater(busy.task.cpu_time, 0.02)
+        self.assertLess(sleeping.task.cpu_time, busy.task.cpu_time / 2)
+        self.assertEqual(sleeping.task.wait_time, 0.0)
+        if RUSAGE_THREAD is not None:
+            self.assertGreaterEqual(sleeping.task.voluntary_switches, 1)
+
+    def test_wait_time(self):
+        ''' tests that the time spent waiting on a child is accounted to the
+        parent as wait time
+        '''
+        @Pykron.AsyncRequest()
+        def child():
+            time.sleep(0.2)
+
+        @Pykron.AsyncRequest()
+        def parent():
+            child().wait_for_completed()
+
+        req = parent()
+        req.wait_for_completed()
+        self.assertGreaterEqual(req.task.wait_time, 0.15)
+        self.assertLessEqual(req.task.wait_time, req.task.duration)
+        self.assertLess(req.task.cpu_time, 0.05)
+        snapshot = Pykron.getInstance().snapshot()
+        self.assertGreaterEqual(snapshot['wait_time'], 0.15)
+
+    def test_inline(self):
+        ''' tests that the CPU time of a child run inline by a waiting pool
+        worker is not accounted to the parent
+        '''
+        Pykron.close()
+        Pykron(pool=PykronPool(min_workers=1, max_workers=1))
+
+        @Pykron.AsyncRequest()
+        def child():
+            burn(0.2)
+
+        @Pykron.AsyncRequest()
+        def parent():
+            req = child()
+            req.wait_for_completed()
+            return req
+
+        req = parent()
+        child_req = req.wait_for_completed()
+        self.assertEqual(child_req.task.thread_id, req.task.thread_id)
+        self.assertGreater(child_req.task.cpu_time, 0.02)
+        self.assertLess(req.task.cpu_time, child_req.task.cpu_time / 2)
+
+if __name__ == '__main__':
+    unittest.main()